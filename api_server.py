@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import functools
+import itertools
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from aiohttp import web
+from dotenv import load_dotenv
+
+from career_paths import watch_catalog
+from career_recommender import AsyncCareerRecommender
+from explanation_service import ExplanationService
+from extraction_cache import ExtractionCache
+from metrics import PrometheusTextSink, configure_from_env, get_metrics
+from request_scheduler import ExtractionScheduler
+from resilience import ResilientCaller
+from session_store import SessionStore, open_session_store
+
+class Session:
+    """One conversation: its recommender, latest recommendations and a lock that serializes its turns."""
+
+    __slots__ = ("session_id", "recommender", "recommendations", "prompt", "last_used", "lock")
+
+    def __init__(self, session_id: str, recommender: AsyncCareerRecommender, prompt: str):
+        self.session_id = session_id
+        self.recommender = recommender
+        self.recommendations: List[Dict] = []
+        self.prompt = prompt
+        self.last_used = time.monotonic()
+        self.lock = asyncio.Lock()
+
+class SessionRegistry:
+    """
+    Bounded, LRU-ordered map of live sessions. Creating a session beyond
+    `max_sessions` evicts the least recently used one, and `evict_idle()` drops
+    sessions untouched for `idle_timeout` seconds. Sessions in the middle of a
+    turn are never evicted, so the map may briefly exceed its bound.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 1800.0):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def add(self, session: Session) -> None:
+        self._sessions[session.session_id] = session
+        overflow = len(self._sessions) - self.max_sessions
+        if overflow > 0:
+            idle = (session_id for session_id, entry in self._sessions.items() if not entry.lock.locked())
+            for session_id in list(itertools.islice(idle, overflow)): # Least recently used first
+                del self._sessions[session_id]
+
+    def get(self, session_id: str) -> Optional[Session]:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def remove(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def evict_idle(self) -> int:
+        """Drops idle sessions from the LRU end and returns how many were removed."""
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = 0
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if session.last_used > cutoff or session.lock.locked():
+                break
+            self._sessions.popitem(last=False)
+            evicted += 1
+        return evicted
+
+class RecommenderAPI:
+    """
+    Headless HTTP front end for AsyncCareerRecommender.
+
+    POST   /sessions                          start a conversation -> session_id, prompt
+    POST   /sessions/{id}/turns               {"message": ...} -> prompt, recommendations
+    GET    /sessions/{id}/recommendations     latest recommendations
+    DELETE /sessions/{id}                     end a conversation
+    GET    /health                            liveness and session count
+    GET    /metrics                           Prometheus text, when a PrometheusTextSink is attached
+
+    With a shared `store`, every turn is saved there and any worker can resume a
+    session it has not seen (or has evicted); the local registry is then only a
+    cache of live recommenders, refreshed when another worker moved a session on.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 1800.0, incremental: bool = True,
+                 cache: Optional[ExtractionCache] = None, resilience: Optional[ResilientCaller] = None,
+                 eviction_interval: float = 60.0, explanations: Optional[ExplanationService] = None,
+                 store: Optional[SessionStore] = None, scheduler: Optional[ExtractionScheduler] = None):
+        self.sessions = SessionRegistry(max_sessions, idle_timeout)
+        self.incremental = incremental
+        self.cache = cache # Shared by every session served by this process
+        self.resilience = resilience
+        self.explanations = explanations # Recommendations carry an explanation once it has been generated
+        self.eviction_interval = eviction_interval
+        self.store = store # Optional shared session state, so sessions are not pinned to this process
+        self.scheduler = scheduler # Optional rate limiting, coalescing and fair queueing of every session's LLM calls
+        self.metrics = get_metrics()
+
+    def create_app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes([
+            web.post("/sessions", self.create_session),
+            web.post("/sessions/{session_id}/turns", self.submit_turn),
+            web.get("/sessions/{session_id}/recommendations", self.get_recommendations),
+            web.delete("/sessions/{session_id}", self.delete_session),
+            web.get("/health", self.health),
+            web.get("/metrics", self.prometheus_metrics),
+        ])
+        app.cleanup_ctx.append(self._background)
+        return app
+
+    async def _background(self, app: web.Application):
+        task = asyncio.ensure_future(self._evict_periodically())
+        yield
+        task.cancel()
+        if "client_pool" in sys.modules: # Only if a turn ever reached the LLM
+            from client_pool import close_shared_async_client
+            await close_shared_async_client()
+
+    async def _blocking(self, fn, *args):
+        """Runs store and explanation I/O (SQLite, dbm) in the default executor so the loop keeps serving other sessions."""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
+
+    async def _evict_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.eviction_interval)
+            evicted = self.sessions.evict_idle()
+            if evicted:
+                self.metrics.incr("api.sessions_evicted", evicted)
+            if self.store is not None:
+                await self._blocking(self.store.prune)
+            self.metrics.gauge("api.sessions", len(self.sessions))
+
+    def _recommender_options(self) -> Dict:
+        return {
+            "incremental": self.incremental,
+            "cache": self.cache,
+            "resilience": self.resilience,
+            "explanations": self.explanations,
+            "scheduler": self.scheduler
+        }
+
+    def _resume(self, session_id: str, state: Dict) -> Session:
+        recommender = AsyncCareerRecommender.from_state(state, **self._recommender_options())
+        session = Session(session_id, recommender, recommender.last_ai_prompt_content)
+        session.recommendations = recommender.recommendations_for(recommender.last_matches)
+        return session
+
+    async def _session_or_404(self, request: web.Request) -> Session:
+        session_id = request.match_info["session_id"]
+        session = self.sessions.get(session_id)
+        if session is None and self.store is not None:
+            state = await self._blocking(self.store.load, session_id) # Started by another worker, or evicted from this one
+            if state is not None:
+                resumed = await self._blocking(self._resume, session_id, state)
+                session = self.sessions.get(session_id) # A concurrent request may have resumed it meanwhile
+                if session is None:
+                    session = resumed
+                    self.sessions.add(session)
+                    self.metrics.incr("api.sessions_resumed")
+        if session is None:
+            raise web.HTTPNotFound(text='{"error": "Unknown or expired session"}', content_type="application/json")
+        return session
+
+    def _restore(self, session: Session, state: Dict) -> None:
+        session.recommender.restore_state(state)
+        session.prompt = session.recommender.last_ai_prompt_content
+        session.recommendations = session.recommender.recommendations_for(session.recommender.last_matches)
+
+    async def _refresh(self, session: Session) -> None:
+        """Reloads a cached session from the store if another worker has taken turns on it since."""
+        state = await self._blocking(self.store.load, session.session_id)
+        if state is None:
+            self.sessions.remove(session.session_id) # Deleted or expired elsewhere
+            raise web.HTTPNotFound(text='{"error": "Unknown or expired session"}', content_type="application/json")
+        if len(state["history"]) != len(session.recommender.conversation_history):
+            await self._blocking(self._restore, session, state)
+
+    async def create_session(self, request: web.Request) -> web.Response:
+        session_id = uuid.uuid4().hex
+        recommender = AsyncCareerRecommender(session_id=session_id, **self._recommender_options())
+        session = Session(session_id, recommender, recommender.start_conversation())
+        self.sessions.add(session)
+        if self.store is not None:
+            await self._blocking(self.store.save, session_id, recommender.to_state())
+        self.metrics.gauge("api.sessions", len(self.sessions))
+        return web.json_response({"session_id": session_id, "prompt": session.prompt}, status=201)
+
+    async def submit_turn(self, request: web.Request) -> web.Response:
+        session = await self._session_or_404(request)
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text='{"error": "Body must be JSON"}', content_type="application/json")
+        message = body.get("message") if isinstance(body, dict) else None
+        if not isinstance(message, str) or not message.strip():
+            raise web.HTTPBadRequest(text='{"error": "message is required"}', content_type="application/json")
+
+        with self.metrics.timer("api.turn"):
+            async with session.lock: # Turns of one session must not interleave
+                if self.store is not None:
+                    await self._refresh(session)
+                prompt, recommendations = await session.recommender.aprocess_response(message)
+                session.prompt = prompt
+                session.recommendations = recommendations
+                if self.store is not None:
+                    await self._blocking(self.store.save, session.session_id, session.recommender.to_state())
+        return web.json_response({
+            "prompt": prompt,
+            "recommendations": recommendations,
+            "degraded_turns": session.recommender.degraded_turns
+        })
+
+    async def get_recommendations(self, request: web.Request) -> web.Response:
+        session = await self._session_or_404(request)
+        if self.store is not None and not session.lock.locked():
+            async with session.lock: # A turn starting during the reload must wait for it
+                await self._refresh(session)
+        return web.json_response({"prompt": session.prompt, "recommendations": session.recommendations})
+
+    async def delete_session(self, request: web.Request) -> web.Response:
+        session_id = request.match_info["session_id"]
+        removed = self.sessions.remove(session_id)
+        if self.store is not None:
+            removed = await self._blocking(self.store.delete, session_id) or removed
+        if not removed:
+            raise web.HTTPNotFound(text='{"error": "Unknown or expired session"}', content_type="application/json")
+        return web.Response(status=204)
+
+    async def health(self, request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok", "sessions": len(self.sessions)})
+
+    async def prometheus_metrics(self, request: web.Request) -> web.Response:
+        sink = next((sink for sink in self.metrics.sinks if isinstance(sink, PrometheusTextSink)), None)
+        if sink is None:
+            raise web.HTTPNotFound(text='{"error": "Prometheus metrics are not enabled"}', content_type="application/json")
+        return web.Response(body=sink.render().encode("utf-8"),
+                            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve career recommendation sessions over HTTP.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-sessions", type=int, default=10000)
+    parser.add_argument("--idle-timeout", type=float, default=1800.0, help="Seconds before an idle session is evicted")
+    parser.add_argument("--full-history", action="store_true", help="Send the whole conversation on every extraction call")
+    parser.add_argument("--cache-path", help="SQLite file backing the shared extraction cache")
+    parser.add_argument("--explanations-path", help="SQLite file of precomputed career explanations (see explanation_service.py)")
+    parser.add_argument("--explanations", action="store_true",
+                        help="Generate missing explanations with background LLM calls (off by default)")
+    parser.add_argument("--session-store", help="Shared session state: memory, sqlite:PATH or dbm:PATH (see session_store.py)")
+    parser.add_argument("--llm-rate", type=float, default=5.0, help="Extraction calls per second to Mistral across all sessions")
+    parser.add_argument("--llm-concurrency", type=int, default=16, help="Extraction calls in flight at once across all sessions")
+    parser.add_argument("--catalog-reload-interval", type=float, default=30.0,
+                        help="Seconds between checks of CAREER_CATALOG_PATH for changes (0 disables)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    configure_from_env()
+    api = RecommenderAPI(
+        max_sessions=args.max_sessions,
+        idle_timeout=args.idle_timeout,
+        incremental=not args.full_history,
+        cache=ExtractionCache(disk_path=args.cache_path),
+        resilience=ResilientCaller(),
+        explanations=ExplanationService(disk_path=args.explanations_path, generate=args.explanations)
+        if args.explanations or args.explanations_path else None,
+        store=open_session_store(args.session_store, ttl_seconds=args.idle_timeout),
+        scheduler=ExtractionScheduler(rate_per_second=args.llm_rate, workers=args.llm_concurrency)
+    )
+    watch_catalog(args.catalog_reload_interval)
+    web.run_app(api.create_app(), host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,17 @@
+import os
 import streamlit as st
+from dotenv import load_dotenv
+from career_paths import watch_catalog
 from career_recommender import CareerRecommender, format_recommendations
+from explanation_service import ExplanationService
+from metrics import configure_from_env, get_metrics
+from report_rendering import render_report
+from request_scheduler import ExtractionScheduler
+from session_store import open_session_store
+
+load_dotenv()  # The recommender no longer reads .env at import time; the app entry point does
+configure_from_env()  # Attach the metrics sink selected by CAREER_METRICS_SINK, if any
+metrics = get_metrics()
 
 # Page configuration
 st.set_page_config(
@@ -10,7 +22,7 @@ st.set_page_config(
 )
 
 # Custom CSS for better styling and layout improvements
-st.markdown("""
+CUSTOM_CSS = """
     <style>
     /* Import Google Fonts */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
@@ -330,7 +342,9 @@ st.markdown("""
         }
     }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+st.markdown(CUSTOM_CSS, unsafe_allow_html=True)
 
 # Sidebar with app description and instructions
 with st.sidebar:
@@ -352,68 +366,231 @@ with st.sidebar:
     st.markdown("---")
     st.markdown("Created by Mayur Bhagat")
 
-# Initialize session state for conversation management
-if 'recommender' not in st.session_state:
-    st.session_state.recommender = CareerRecommender()
-    st.session_state.display_history = []
-    st.session_state.current_prompt = st.session_state.recommender.start_conversation()
+@st.cache_resource
+def get_explanation_service():
+    """One explanation service per process; CAREER_EXPLANATIONS_PATH keeps explanations across restarts."""
+    return ExplanationService(disk_path=os.getenv("CAREER_EXPLANATIONS_PATH"))
+
+@st.cache_resource
+def get_scheduler():
+    """
+    One scheduler for every session in the process: extraction calls are rate limited to
+    CAREER_LLM_RATE per second (default 5), at most CAREER_LLM_CONCURRENCY (default 4) run
+    at once, and identical requests in flight share one call.
+    """
+    return ExtractionScheduler(
+        rate_per_second=float(os.getenv("CAREER_LLM_RATE", "5")),
+        workers=int(os.getenv("CAREER_LLM_CONCURRENCY", "4"))
+    )
+
+@st.cache_resource
+def start_catalog_watcher():
+    """Reloads CAREER_CATALOG_PATH when it changes, checked every CAREER_CATALOG_RELOAD_SECONDS (default 30, 0 disables)."""
+    return watch_catalog(float(os.getenv("CAREER_CATALOG_RELOAD_SECONDS", "30")))
+
+start_catalog_watcher()
+
+@st.cache_resource
+def get_session_store():
+    """
+    Store selected by CAREER_SESSION_STORE (memory, sqlite:PATH or dbm:PATH). With a
+    shared store a conversation survives restarts and reconnects to another worker,
+    found again through the ?session= URL parameter; without one it lives in this process only.
+    """
+    return open_session_store(os.getenv("CAREER_SESSION_STORE"))
+
+def start_session(state=None):
+    """Starts a new conversation, or resumes one from a stored state."""
+    if state is None:
+        recommender = CareerRecommender(explanations=get_explanation_service(), scheduler=get_scheduler())
+        st.session_state.current_prompt = recommender.start_conversation()
+        st.session_state.display_history = []
+    else:
+        recommender = CareerRecommender.from_state(state, explanations=get_explanation_service(), scheduler=get_scheduler())
+        st.session_state.current_prompt = recommender.last_ai_prompt_content
+        # History alternates user and assistant messages, one pair per displayed turn
+        history = recommender.conversation_history
+        st.session_state.display_history = [
+            {
+                "user_message": history[2 * i]["content"],
+                "recommendations": recommender.recommendations_for(matches),
+                "ai_prompt": history[2 * i + 1]["content"]
+            }
+            for i, matches in enumerate(state.get("display", []))
+        ]
+    st.session_state.recommender = recommender
     st.session_state.current_input_value = ""
     st.session_state.conversation_started = False
-    st.session_state.recommendations_shown = False  # New flag to track if recommendations have been shown
+    st.session_state.recommendations_shown = bool(st.session_state.display_history)  # Flag to track if recommendations have been shown
+    st.session_state.pending_input = None  # Submitted input that still has to be processed
+    if get_session_store() is not None:
+        st.query_params["session"] = recommender.session_id
+
+def save_session():
+    """Writes the conversation to the session store, if one is configured."""
+    store = get_session_store()
+    if store is None:
+        return
+    recommender = st.session_state.recommender
+    state = recommender.to_state()
+    # Per-turn matches, so a resumed page can rebuild earlier recommendations, not just the latest
+    state["display"] = [
+        [[rec["path"], rec["confidence"]] for rec in turn["recommendations"]]
+        for turn in st.session_state.display_history
+    ]
+    store.save(recommender.session_id, state)
+
+# Initialize session state for conversation management
+if 'recommender' not in st.session_state:
+    store = get_session_store()
+    session_id = st.query_params.get("session")
+    start_session(store.load(session_id) if store is not None and session_id else None)
 
-# Function to handle submission and process input
+# Function to handle submission; the response itself is streamed into the page below
 def handle_submit():
     user_input = st.session_state.user_input_form_key
     if user_input:
-        with st.spinner("Analyzing your interests..."):
-            next_prompt, recommendations = st.session_state.recommender.process_response(user_input)
-            st.session_state.display_history.append({
-                "user_message": user_input,
-                "recommendations": recommendations,
-                "ai_prompt": next_prompt
-            })
-            st.session_state.current_prompt = next_prompt
-            st.session_state.current_input_value = ""
-            st.session_state.recommendations_shown = True  # Set flag to True after first submission
+        st.session_state.pending_input = user_input
+        st.session_state.current_input_value = ""
     else:
         st.warning("Please provide a response.")
 
 # Function to reset the conversation
 def reset_conversation():
-    st.session_state.recommender = CareerRecommender()
-    st.session_state.display_history = []
-    st.session_state.current_prompt = st.session_state.recommender.start_conversation()
-    st.session_state.current_input_value = ""
+    store = get_session_store()
+    if store is not None:
+        store.delete(st.session_state.recommender.session_id)
+    start_session()
+
+@st.cache_data(max_entries=1000)
+def recommendations_html(recommendations):
+    """HTML for a list of recommendations, memoized by their content."""
+    return "### Your Career Path Recommendations\n\n" + render_report(recommendations, "html")
+
+def render_recommendations(recommendations):
+    st.markdown(recommendations_html(recommendations), unsafe_allow_html=True)
+
+def fill_explanations(recommendations):
+    """
+    Copies explanations finished in the background into the recommendations. True once
+    every prefetch has settled, so a turn whose explanation failed is frozen without it.
+    """
+    service = get_explanation_service()
+    settled = True
+    for rec in recommendations:
+        if not rec.get("explanation"):
+            done = service.settled(rec["path"]) # Checked first: a generation finishing in between is still read below
+            rec["explanation"] = service.cached(rec["path"])
+            settled = settled and (done or rec["explanation"] is not None)
+    return settled
+
+def render_turn(turn):
+    """One finished turn; only the escaped recommendations HTML is rendered as HTML, never the conversation text."""
+    st.markdown(f"**You:** {turn['user_message']}")
+    if turn['recommendations']:
+        if "html" not in turn and fill_explanations(turn['recommendations']):
+            turn["html"] = recommendations_html(turn['recommendations'])  # Freeze once every explanation has arrived
+        st.markdown(turn.get("html") or recommendations_html(turn['recommendations']), unsafe_allow_html=True)
+    st.markdown(f"**AI:** {turn['ai_prompt']}")
+
+def stream_turn(user_input):
+    """Processes a submitted response, rendering model output, interests and recommendations as they arrive."""
+    st.markdown(f"**You:** {user_input}")
+    status_placeholder = st.empty()
+    status_placeholder.caption("Analyzing your interests...")
+    interests_placeholder = st.empty()
+    recommendations_placeholder = st.empty()
+
+    model_output = ""
+    interests = []
+    recommendations = []
+    next_prompt = ""
+    for event, payload in st.session_state.recommender.process_response_stream(user_input):
+        if event == "token":
+            model_output += payload
+            status_placeholder.caption(f"Model output: {model_output}")
+        elif event == "interest":
+            interests.append(payload)
+            interests_placeholder.markdown("**Interests so far:** " + ", ".join(interests))
+        elif event == "recommendations":
+            recommendations = payload
+            if recommendations:
+                with recommendations_placeholder.container():
+                    render_recommendations(recommendations)
+        elif event == "prompt":
+            next_prompt = payload
+    status_placeholder.empty()
+    st.markdown(f"**AI:** {next_prompt}")
+
+    turn = {
+        "user_message": user_input,
+        "recommendations": recommendations,
+        "ai_prompt": next_prompt
+    }
+    if fill_explanations(recommendations):
+        turn["html"] = recommendations_html(recommendations)  # Pre-rendered so history reruns do no formatting work
+    st.session_state.display_history.append(turn)
+    st.session_state.current_prompt = next_prompt
+    st.session_state.recommendations_shown = True  # Set flag to True after first submission
+    save_session()
+
+def input_form():
+    with st.form(key='user_input_form'):
+        user_response_label = "Share your interests, skills, and what you enjoy doing:" if not st.session_state.display_history else "Your response to the AI:"
+        st.text_area(
+            user_response_label,
+            value=st.session_state.current_input_value,
+            height=150,
+            max_chars=1000,
+            key="user_input_form_key"
+        )
+
+        submit_col, reset_col = st.columns([0.7, 0.3])
+        with submit_col:
+            st.form_submit_button("Submit", type="primary", on_click=handle_submit, use_container_width=True)
+        with reset_col:
+            st.form_submit_button("Reset Conversation", type="secondary", on_click=reset_conversation, use_container_width=True)
+
+EXPORT_FORMATS = {  # Download label -> (report format, file extension, MIME type)
+    "Markdown": ("markdown", "md", "text/markdown"),
+    "HTML": ("html", "html", "text/html"),
+    "CSV": ("csv", "csv", "text/csv"),
+    "JSON": ("json", "json", "application/json"),
+    "Text": ("text", "txt", "text/plain")
+}
+
+@st.fragment
+def export_report():
+    """Download of the latest recommendations, rendered by the same templates as the page and the bulk CLI."""
+    latest = next((turn for turn in reversed(st.session_state.display_history) if turn["recommendations"]), None)
+    if latest is None:
+        return
+    st.markdown("---")
+    label = st.selectbox("Export recommendations as", list(EXPORT_FORMATS))
+    fmt, extension, mime = EXPORT_FORMATS[label]
+    document = latest.get("exports", {}).get(fmt)
+    if document is None:
+        document = render_report(latest["recommendations"], fmt, document=True)
+        if "html" in latest:  # Frozen turns no longer change, so their documents are kept with them
+            latest.setdefault("exports", {})[fmt] = document
+    st.download_button("Download report", data=document,
+                       file_name=f"career_recommendations.{extension}", mime=mime, use_container_width=True)
 
 # Main content area
 st.title("AI-Powered Career Navigator")
 st.markdown("### Your Personalized Journey to Professional Growth")
 
-# Display conversation history
-for turn in st.session_state.display_history:
-    if "user_message" in turn:
-        st.markdown(f"**You:** {turn['user_message']}")
-    
-    if "recommendations" in turn and turn['recommendations']:
-        st.markdown("### Your Career Path Recommendations")
-        for rec in turn['recommendations']:
-            confidence_class = "confidence-high" if rec['confidence'] > 0.7 else "confidence-medium" if rec['confidence'] > 0.4 else "confidence-low"
-            st.markdown(f"""
-                <h2>{rec['path']} <span class="confidence-badge {confidence_class}">{rec['confidence']:.0%}</span></h2>
-                <p><strong>Overview:</strong><br>{rec['description']}</p>
-                <p><strong>Recommended Career Options:</strong></p>
-                <ol>
-                    {' '.join(f'<li>{career}</li>' for career in rec['careers'][:3])}
-                </ol>
-                <p><strong>Career Roadmap:</strong></p>
-                <ol>
-                    {' '.join(f'<li>{step}</li>' for step in rec['roadmap'])}
-                </ol>
-                <hr>
-            """, unsafe_allow_html=True)
-    
-    if "ai_prompt" in turn:
-        st.markdown(f"**AI:** {turn['ai_prompt']}")
+# Display conversation history, with recommendation markup pre-rendered per turn
+with metrics.timer("app.render_history"):
+    for turn in st.session_state.display_history:
+        render_turn(turn)
+
+# Stream the response to a newly submitted input
+if st.session_state.pending_input:
+    pending_input = st.session_state.pending_input
+    st.session_state.pending_input = None
+    with metrics.timer("app.stream_turn"):
+        stream_turn(pending_input)
 
 # Display the current prompt
 if not st.session_state.display_history:
@@ -424,21 +601,10 @@ elif st.session_state.recommendations_shown:
 st.markdown(st.session_state.current_prompt)
 
 # Input section using st.form
-with st.form(key='user_input_form'):
-    user_response_label = "Share your interests, skills, and what you enjoy doing:" if not st.session_state.display_history else "Your response to the AI:"
-    st.text_area(
-        user_response_label,
-        value=st.session_state.current_input_value,
-        height=150,
-        max_chars=1000,
-        key="user_input_form_key"
-    )
-    
-    submit_col, reset_col = st.columns([0.7, 0.3])
-    with submit_col:
-        st.form_submit_button("Submit", type="primary", on_click=handle_submit, use_container_width=True)
-    with reset_col:
-        st.form_submit_button("Reset Conversation", type="secondary", on_click=reset_conversation, use_container_width=True)
+input_form()
+
+with st.sidebar:
+    export_report()
 
 # Footer
 st.markdown("""
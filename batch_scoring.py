@@ -0,0 +1,107 @@
+from collections import OrderedDict
+from itertools import chain
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from career_paths import get_catalog
+from keyword_matcher import KeywordMatcher
+
+# Below this many paths a full stable sort is cheap and gives the same tie order as map_interests_to_careers
+_FULL_SORT_MAX_PATHS = 256
+
+class BatchScores(NamedTuple):
+    paths: List[str] # Column labels of the matrices below
+    confidences: np.ndarray # (users, paths) normalized confidence scores
+    top_indices: np.ndarray # (users, top_k) path indices, best match first
+
+    def top_matches(self, row: int) -> List[tuple]:
+        """Returns [(path, confidence), ...] for one user, like map_interests_to_careers."""
+        return [(self.paths[i], float(self.confidences[row, i])) for i in self.top_indices[row]]
+
+class BatchScorer:
+    """
+    Vectorized scoring of many users' interests against the career catalog.
+
+    A keyword x path incidence matrix is built once; each chunk of users becomes a
+    user x keyword count matrix whose product with the incidence matrix gives the
+    same raw scores as map_interests_to_careers for every user at once.
+    """
+
+    def __init__(self, career_paths: Optional[Dict[str, Dict]] = None, matcher: Optional[KeywordMatcher] = None,
+                 max_cached_interests: int = 100000):
+        if career_paths is None:
+            catalog = get_catalog()
+            self.matcher = matcher or catalog.matcher
+            self.paths = list(catalog.paths)
+        else:
+            self.matcher = matcher or KeywordMatcher.from_career_paths(career_paths)
+            self.paths = list(career_paths.keys())
+        path_index = {path: i for i, path in enumerate(self.paths)}
+
+        self.incidence = np.zeros((len(self.matcher.keywords), len(self.paths)), dtype=np.float32)
+        for keyword_id, paths in enumerate(self.matcher.keyword_paths):
+            for path in paths:
+                self.incidence[keyword_id, path_index[path]] = 1.0
+        # LRU of matched keyword ids per interest string; bounded so a long cohort run does not grow without limit
+        self.max_cached_interests = max_cached_interests
+        self._interest_ids: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def _keyword_ids(self, interest: str) -> np.ndarray:
+        ids = self._interest_ids.get(interest)
+        if ids is None:
+            ids = self._interest_ids[interest] = np.fromiter(sorted(self.matcher.match_ids(interest)), dtype=np.int64)
+            if len(self._interest_ids) > self.max_cached_interests:
+                self._interest_ids.popitem(last=False) # Evict least recently used
+        else:
+            self._interest_ids.move_to_end(interest)
+        return ids
+
+    def keyword_counts(self, interest_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """Returns the (users, keywords) matrix of keyword hits, one hit per keyword per interest."""
+        n_users = len(interest_lists)
+        n_keywords = len(self.matcher.keywords)
+        lengths = np.fromiter(map(len, interest_lists), dtype=np.int64, count=n_users)
+        interests = list(chain.from_iterable(interest_lists))
+        interest_rows = np.repeat(np.arange(n_users), lengths)
+
+        # A slot table of this chunk's distinct interests only, so the cost follows the chunk, not the run so far
+        distinct = list(dict.fromkeys(interests))
+        slot_of = {interest: slot for slot, interest in enumerate(distinct)}
+        slot_ids = [self._keyword_ids(interest) for interest in distinct]
+        interest_slots = np.fromiter((slot_of[interest] for interest in interests), dtype=np.int64, count=len(interests))
+
+        # Gather every interest's keyword ids from the flattened slot table without a Python loop
+        slot_lengths = np.fromiter(map(len, slot_ids), dtype=np.int64, count=len(slot_ids))
+        slot_starts = np.concatenate(([0], np.cumsum(slot_lengths)[:-1])) if slot_ids else np.zeros(0, dtype=np.int64)
+        slot_table = np.concatenate(slot_ids) if slot_ids else np.zeros(0, dtype=np.int64)
+        hit_counts = slot_lengths[interest_slots] if interest_slots.size else np.zeros(0, dtype=np.int64)
+        hit_rows = np.repeat(interest_rows, hit_counts)
+        hit_offsets = np.arange(hit_counts.sum()) - np.repeat(np.cumsum(hit_counts) - hit_counts, hit_counts)
+        hit_cols = slot_table[np.repeat(slot_starts[interest_slots] if interest_slots.size else interest_slots, hit_counts) + hit_offsets]
+
+        counts = np.bincount(hit_rows * n_keywords + hit_cols, minlength=n_users * n_keywords)
+        return counts.astype(np.float32).reshape(n_users, n_keywords)
+
+    def score(self, interest_lists: Sequence[Sequence[str]], top_k: int = 3) -> BatchScores:
+        """Scores a batch of interest lists and returns normalized confidences plus top-k indices."""
+        raw = self.keyword_counts(interest_lists) @ self.incidence
+        totals = raw.sum(axis=1, keepdims=True)
+        confidences = np.divide(raw, totals, out=np.zeros_like(raw), where=totals > 0)
+        return BatchScores(self.paths, confidences, self._top_k(confidences, top_k))
+
+    def iter_scores(self, interest_lists: Sequence[Sequence[str]], top_k: int = 3, chunk_size: int = 4096) -> Iterator[BatchScores]:
+        """Scores a large cohort in fixed-size chunks to bound memory use."""
+        for start in range(0, len(interest_lists), chunk_size):
+            yield self.score(interest_lists[start:start + chunk_size], top_k)
+
+    def _top_k(self, confidences: np.ndarray, top_k: int) -> np.ndarray:
+        n_paths = confidences.shape[1]
+        k = max(0, min(top_k, n_paths))
+        if n_paths <= _FULL_SORT_MAX_PATHS or k == n_paths:
+            return np.argsort(-confidences, axis=1, kind="stable")[:, :k]
+        candidates = np.argpartition(-confidences, k - 1, axis=1)[:, :k]
+        candidate_scores = np.take_along_axis(confidences, candidates, axis=1)
+        # Order the k candidates by descending score; ties at the k-th boundary may pick any tied path
+        order = np.lexsort((candidates, -candidate_scores), axis=1)
+        return np.take_along_axis(candidates, order, axis=1)
@@ -0,0 +1 @@
+"""Offline benchmarks and load tools for the career recommender. Run modules with `python -m benchmarks.<name>`."""
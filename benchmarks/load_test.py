@@ -0,0 +1,256 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import DEFAULT_RESPONSE_TEXT, StubMistralServer
+from career_paths import get_catalog
+from career_recommender import CareerRecommender
+from client_pool import PooledMistralClient
+from metrics import percentiles
+from resilience import ResilientCaller
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.jsonl")
+
+def load_corpus(path: str) -> List[List[str]]:
+    """Reads scripted conversations: one JSON object per line with a "turns" list of user messages."""
+    conversations = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                turns = json.loads(line)["turns"]
+                if turns:
+                    conversations.append(turns)
+    if not conversations:
+        raise ValueError(f"No conversations found in {path}")
+    return conversations
+
+class CorpusStubServer(StubMistralServer):
+    """Stub that answers extraction calls with the catalog keywords found in the newest message."""
+
+    def reply_for(self, request: Dict) -> str:
+        messages = request.get("messages") or [{}]
+        keywords = get_catalog().matcher.match(messages[-1].get("content", ""))
+        return ", ".join(keywords) or DEFAULT_RESPONSE_TEXT
+
+class TurnRecorder:
+    """Thread-safe collection of per-turn outcomes."""
+
+    def __init__(self):
+        self.latencies: Dict[int, List[float]] = {} # Turn index -> latencies of successful turns
+        self.turns = 0
+        self.errors = 0
+        self.degraded = 0
+        self._lock = threading.Lock()
+
+    def record(self, turn: int, latency: float, error: bool = False, degraded: bool = False) -> None:
+        with self._lock:
+            self.turns += 1
+            if error:
+                self.errors += 1
+                return
+            self.degraded += degraded
+            self.latencies.setdefault(turn, []).append(latency)
+
+    def summary(self, elapsed: float, conversations: int) -> Dict:
+        everything = [value for values in self.latencies.values() for value in values]
+        return {
+            "conversations": conversations,
+            "turns": self.turns,
+            "elapsed_s": elapsed,
+            "turns_per_second": self.turns / elapsed if elapsed else 0.0,
+            "conversations_per_second": conversations / elapsed if elapsed else 0.0,
+            "error_rate": self.errors / self.turns if self.turns else 0.0,
+            "fallback_rate": self.degraded / self.turns if self.turns else 0.0,
+            "latency_ms": {k: v * 1000 for k, v in percentiles(everything).items()},
+            "per_turn": [
+                {
+                    "turn": turn,
+                    "count": len(self.latencies[turn]),
+                    "latency_ms": {k: v * 1000 for k, v in percentiles(self.latencies[turn], (50, 95, 99)).items()}
+                }
+                for turn in sorted(self.latencies)
+            ]
+        }
+
+def _assign(conversations: List[List[str]], users: int, per_user: int) -> List[List[List[str]]]:
+    """Deals the corpus round-robin: each user gets per_user conversations."""
+    return [[conversations[(user * per_user + i) % len(conversations)] for i in range(per_user)] for user in range(users)]
+
+def run_direct(server_url: str, conversations: List[List[str]], users: int, per_user: int,
+               incremental: bool, resilience: Optional[ResilientCaller]) -> Dict:
+    """N threads, each driving CareerRecommender sessions in-process against the stub."""
+    client = PooledMistralClient(api_key="stub", endpoint=server_url, max_retries=0,
+                                 pool_size=users, max_concurrent_requests=users)
+    recorder = TurnRecorder()
+
+    def user(script: List[List[str]]) -> None:
+        for turns in script:
+            recommender = CareerRecommender(incremental=incremental, client=client, resilience=resilience)
+            recommender.start_conversation()
+            for index, message in enumerate(turns, start=1):
+                degraded_before = recommender.degraded_turns
+                start = time.perf_counter()
+                try:
+                    recommender.process_response(message)
+                except Exception:
+                    recorder.record(index, time.perf_counter() - start, error=True)
+                    continue
+                recorder.record(index, time.perf_counter() - start, degraded=recommender.degraded_turns > degraded_before)
+
+    scripts = _assign(conversations, users, per_user)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        list(pool.map(user, scripts))
+    elapsed = time.perf_counter() - started
+    client.close()
+    return recorder.summary(elapsed, users * per_user)
+
+async def run_api(base_url: Optional[str], server_url: str, conversations: List[List[str]], users: int,
+                  per_user: int, incremental: bool, resilience: Optional[ResilientCaller],
+                  session_store: Optional[str] = None) -> Dict:
+    """N concurrent clients driving the HTTP API; starts one in-process when no base_url is given."""
+    import aiohttp
+    from aiohttp import web
+
+    runner = None
+    if base_url is None:
+        from api_server import RecommenderAPI
+        from session_store import open_session_store
+        os.environ["MISTRAL_ENDPOINT"] = server_url
+        os.environ["MISTRAL_MAX_RETRIES"] = "0"
+        os.environ.setdefault("MISTRAL_API_KEY", "stub")
+        api = RecommenderAPI(max_sessions=users * per_user, incremental=incremental, resilience=resilience,
+                             store=open_session_store(session_store))
+        runner = web.AppRunner(api.create_app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = runner.addresses[0][:2]
+        base_url = f"http://{host}:{port}"
+
+    recorder = TurnRecorder()
+
+    async def user(session: "aiohttp.ClientSession", script: List[List[str]]) -> None:
+        for turns in script:
+            async with session.post(f"{base_url}/sessions") as response:
+                session_id = (await response.json())["session_id"]
+            degraded_before = 0
+            for index, message in enumerate(turns, start=1):
+                start = time.perf_counter()
+                async with session.post(f"{base_url}/sessions/{session_id}/turns", json={"message": message}) as response:
+                    body = await response.json() if response.status == 200 else None
+                latency = time.perf_counter() - start
+                if body is None:
+                    recorder.record(index, latency, error=True)
+                    continue
+                recorder.record(index, latency, degraded=body.get("degraded_turns", 0) > degraded_before)
+                degraded_before = body.get("degraded_turns", 0)
+            async with session.delete(f"{base_url}/sessions/{session_id}"):
+                pass
+
+    scripts = _assign(conversations, users, per_user)
+    try:
+        connector = aiohttp.TCPConnector(limit=users)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            started = time.perf_counter()
+            await asyncio.gather(*(user(session, script) for script in scripts))
+            elapsed = time.perf_counter() - started
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+    return recorder.summary(elapsed, users * per_user)
+
+def measure_session_memory(server_url: str, conversations: List[List[str]], incremental: bool,
+                           sessions: int = 20) -> Dict:
+    """Retained heap per finished session (traced with tracemalloc), after running its full conversation."""
+    client = PooledMistralClient(api_key="stub", endpoint=server_url, max_retries=0)
+
+    def converse(turns: List[str]) -> CareerRecommender:
+        recommender = CareerRecommender(incremental=incremental, client=client)
+        recommender.start_conversation()
+        for message in turns:
+            recommender.process_response(message)
+        return recommender
+
+    converse(conversations[0]) # Warm up imports, pools and caches outside the measurement
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        kept = [converse(conversations[i % len(conversations)]) for i in range(sessions)]
+        retained = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+        client.close()
+    average_turns = sum(len(conversations[i % len(conversations)]) for i in range(sessions)) / sessions
+    return {"sessions": len(kept), "turns_per_session": average_turns, "bytes_per_session": retained / sessions}
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Drive concurrent scripted conversations against a stub LLM.")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="JSONL file of scripted conversations")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent synthetic users")
+    parser.add_argument("--conversations-per-user", type=int, default=2)
+    parser.add_argument("--target", choices=["direct", "api"], default="direct",
+                        help="Call CareerRecommender in-process or go through the HTTP API")
+    parser.add_argument("--api-url", help="Existing API server to load (api target); one is started in-process otherwise")
+    parser.add_argument("--full-history", action="store_true", help="Disable incremental extraction")
+    parser.add_argument("--session-store", help="Session store for the in-process API: memory, sqlite:PATH or dbm:PATH")
+    parser.add_argument("--no-resilience", action="store_true", help="Let provider errors fail turns instead of falling back")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="Seconds the stub waits per call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub calls answered with HTTP 500")
+    parser.add_argument("--memory-sessions", type=int, default=20, help="Sessions traced for the memory estimate (0 to skip)")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("career_recommender").setLevel(logging.ERROR) # Fallback warnings would flood the report
+    conversations = load_corpus(args.corpus)
+    incremental = not args.full_history
+    resilience = None if args.no_resilience else ResilientCaller(
+        deadline=max(5.0, args.stub_latency * 20),
+        max_workers=args.users * 2
+    )
+
+    with CorpusStubServer(latency=args.stub_latency, error_rate=args.error_rate, seed=1) as server:
+        if args.target == "direct":
+            results = run_direct(server.url, conversations, args.users, args.conversations_per_user, incremental, resilience)
+        else:
+            results = asyncio.run(run_api(args.api_url, server.url, conversations, args.users,
+                                          args.conversations_per_user, incremental, resilience, args.session_store))
+        results["stub"] = {"requests": len(server.requests), "injected_errors": server.errors}
+        if args.memory_sessions:
+            server.error_rate = 0.0
+            results["memory"] = measure_session_memory(server.url, conversations, incremental, args.memory_sessions)
+    results.update({"target": args.target, "users": args.users, "incremental": incremental,
+                    "stub_latency_ms": args.stub_latency * 1000, "error_rate_injected": args.error_rate})
+
+    print(f"{results['turns']} turns / {results['conversations']} conversations in {results['elapsed_s']:.2f}s  "
+          f"({results['turns_per_second']:.1f} turns/s, {results['conversations_per_second']:.2f} conversations/s)")
+    print(f"latency p50 {results['latency_ms']['p50']:.1f} ms  p95 {results['latency_ms']['p95']:.1f} ms  "
+          f"p99 {results['latency_ms']['p99']:.1f} ms")
+    print(f"error rate {results['error_rate']:.2%}  fallback rate {results['fallback_rate']:.2%}  "
+          f"(stub injected {server.errors} errors over {len(server.requests)} requests)")
+    for entry in results["per_turn"]:
+        latency = entry["latency_ms"]
+        print(f"  turn {entry['turn']:>2}  n={entry['count']:<5} p50 {latency['p50']:.1f} ms  "
+              f"p95 {latency['p95']:.1f} ms  p99 {latency['p99']:.1f} ms")
+    if "memory" in results:
+        memory = results["memory"]
+        print(f"memory per session {memory['bytes_per_session'] / 1024:.1f} KiB "
+              f"after {memory['turns_per_session']:.1f} turns")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    main()
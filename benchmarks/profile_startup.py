@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ["career_paths", "career_recommender", "api_server", "client_pool"]
+
+# Runs in a fresh interpreter so nothing is warm; prints one JSON object
+_INIT_PROFILE = """
+import json, sys, time
+timings = {}
+def timed(name, fn):
+    start = time.perf_counter()
+    result = fn()
+    timings[name] = time.perf_counter() - start
+    return result
+
+timed("import career_recommender", lambda: __import__("career_recommender"))
+from career_paths import get_catalog
+from career_recommender import CareerRecommender
+from interest_extractors import KeywordInterestExtractor
+timed("catalog index (first access)", get_catalog)
+timed("CareerRecommender() first", CareerRecommender)
+timed("CareerRecommender() again", CareerRecommender)
+timed("KeywordInterestExtractor() first", KeywordInterestExtractor)
+timed("KeywordInterestExtractor() again", KeywordInterestExtractor)
+sdk_before_client = any(name.startswith("mistralai") for name in sys.modules)
+recommender = CareerRecommender()
+timed("Mistral client (first LLM use)", lambda: recommender.client)
+print(json.dumps({"timings": timings, "sdk_loaded_before_first_llm_use": sdk_before_client}))
+"""
+
+def import_profile(module: str, top: int = 8) -> Dict:
+    """Cumulative import time of a module in a fresh interpreter, with its heaviest dependencies."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        return {"module": module, "error": completed.stderr.strip().splitlines()[-1:]}
+
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [part.strip() for part in line[len("import time:"):].split("|")]
+        if not parts[0].isdigit():
+            continue # Header line
+        entries.append({"name": parts[2], "self_us": int(parts[0]), "cumulative_us": int(parts[1]),
+                        "depth": (len(line.split("|")[2]) - len(line.split("|")[2].lstrip())) // 2})
+    # importtime lists children before their parent: the module's direct imports are the
+    # depth-1 entries between the previous top-level entry and the module itself
+    target, children, direct = None, [], []
+    for entry in entries:
+        if entry["depth"] == 0:
+            if entry["name"] == module:
+                target, direct = entry, children
+            children = []
+        elif entry["depth"] == 1:
+            children.append(entry)
+    direct = sorted(direct, key=lambda entry: entry["cumulative_us"], reverse=True)
+    return {
+        "module": module,
+        "cumulative_ms": target["cumulative_us"] / 1000 if target else None,
+        "modules_loaded": len(entries),
+        "sdk_imported": any(entry["name"].startswith("mistralai") for entry in entries),
+        "heaviest": [{"name": entry["name"], "cumulative_ms": entry["cumulative_us"] / 1000} for entry in direct[:top]]
+    }
+
+def init_profile() -> Dict:
+    """Time to first catalog access, recommender construction and first client creation, in a fresh interpreter."""
+    env = dict(os.environ, MISTRAL_API_KEY=os.getenv("MISTRAL_API_KEY", "profile"))
+    completed = subprocess.run([sys.executable, "-c", _INIT_PROFILE], cwd=REPO_ROOT, capture_output=True, text=True, env=env)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Report import-time and initialization cost of the recommender stack.")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = {"imports": [import_profile(module) for module in args.modules], "init": init_profile()}
+
+    print("Import time (fresh interpreter, cumulative):")
+    for entry in report["imports"]:
+        if "error" in entry:
+            print(f"  {entry['module']:<22} failed: {entry['error']}")
+            continue
+        sdk = "  [loads mistralai]" if entry["sdk_imported"] else ""
+        print(f"  {entry['module']:<22} {entry['cumulative_ms']:8.1f} ms  {entry['modules_loaded']:>4} modules{sdk}")
+        for dependency in entry["heaviest"][:4]:
+            print(f"      {dependency['name']:<30} {dependency['cumulative_ms']:8.1f} ms")
+
+    print("Initialization (fresh interpreter):")
+    if "error" in report["init"]:
+        print(f"  failed: {report['init']['error']}")
+    else:
+        for name, seconds in report["init"]["timings"].items():
+            print(f"  {name:<36} {seconds * 1000:8.2f} ms")
+        print(f"  SDK loaded before first LLM use: {report['init']['sdk_loaded_before_first_llm_use']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+if __name__ == "__main__":
+    main()
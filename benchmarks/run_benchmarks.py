@@ -0,0 +1,220 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.stub_server import StubMistralServer
+from career_catalog import CareerCatalog
+from career_paths import CAREER_PATHS, CATALOG_STORE, map_interests_to_careers
+from career_taxonomy import CareerTaxonomy
+from career_recommender import CareerRecommender, format_recommendations
+from client_pool import PooledMistralClient
+from metrics import percentiles
+
+SAMPLE_INTERESTS = [
+    "programming", "data analysis", "creative writing", "patient care", "teaching kids",
+    "sports coaching", "music production", "financial strategy", "machine learning",
+    "physical fitness", "graphic design", "marketing", "nutrition", "robotics"
+]
+
+SAMPLE_TURNS = [
+    "I like programming and math, and I spend weekends building small robots.",
+    "I also enjoy writing short stories and designing posters for my school club.",
+    "In the future I'd like to work in a team, maybe remotely, with flexible hours.",
+    "Helping people matters to me; I volunteered at a clinic last summer.",
+    "I coach a junior football team and keep track of their fitness data.",
+    "Money-wise I follow the stock market and like thinking about business strategy.",
+    "I'm not sure about the office, but I like research and learning new things."
+]
+
+def synthetic_catalog(n_paths: int, keywords_per_path: int = 12, seed: int = 7) -> Dict[str, Dict]:
+    """Builds a CAREER_PATHS-style catalog of n_paths paths, seeded with the real keywords."""
+    rng = random.Random(seed)
+    vocabulary = [keyword for data in CAREER_PATHS.values() for keyword in data["keywords"]]
+    vocabulary += [f"skill{i}" for i in range(n_paths * 4)]
+    catalog = {}
+    for i in range(n_paths):
+        catalog[f"Path {i}"] = {
+            "keywords": rng.sample(vocabulary, keywords_per_path),
+            "careers": [f"Career {i}.{j}" for j in range(5)],
+            "description": f"Synthetic career path {i}.",
+            "roadmap": ["Foundation", "Entry-Level", "Mid-Level", "Senior"]
+        }
+    return catalog
+
+def synthetic_taxonomy(sectors: int, paths_per_sector: int, occupations_per_path: int, seed: int = 7) -> CareerTaxonomy:
+    """Builds a sector -> path -> occupation taxonomy, seeded with the real keywords."""
+    rng = random.Random(seed)
+    vocabulary = [keyword for data in CAREER_PATHS.values() for keyword in data["keywords"]]
+    vocabulary += [f"skill{i}" for i in range(sectors * paths_per_sector * 4)]
+    return CareerTaxonomy([
+        {
+            "name": f"Sector {s}",
+            "keywords": rng.sample(vocabulary, 4),
+            "paths": [
+                {
+                    "name": f"Path {s}.{p}",
+                    "keywords": rng.sample(vocabulary, 6),
+                    "occupations": [
+                        {"name": f"Occupation {s}.{p}.{o}", "keywords": rng.sample(vocabulary, 3)}
+                        for o in range(occupations_per_path)
+                    ]
+                }
+                for p in range(paths_per_sector)
+            ]
+        }
+        for s in range(sectors)
+    ])
+
+def _time_calls(fn: Callable[[], object], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def bench_mapping(catalog_sizes: Sequence[int], repeat: int) -> List[Dict]:
+    """Latency and throughput of map_interests_to_careers(top_k=3), as the recommender calls it, at several catalog sizes."""
+    results = []
+    interests = SAMPLE_INTERESTS[:8]
+    for size in catalog_sizes:
+        previous = CATALOG_STORE.swap(CareerCatalog.from_mapping(synthetic_catalog(size)))
+        try:
+            map_interests_to_careers(interests, top_k=3) # Warm up
+            samples = _time_calls(lambda: map_interests_to_careers(interests, top_k=3), repeat)
+        finally:
+            CATALOG_STORE.swap(previous)
+        total = sum(samples)
+        results.append({
+            "catalog_paths": size,
+            "interests_per_call": len(interests),
+            "latency_ms": {k: v * 1000 for k, v in percentiles(samples).items()},
+            "interests_per_second": len(interests) * repeat / total if total else 0.0
+        })
+    return results
+
+def bench_taxonomy(shapes: Sequence[Sequence[int]], repeat: int) -> List[Dict]:
+    """Latency of top-3 occupation search in hierarchical catalogs of several sizes."""
+    results = []
+    interests = SAMPLE_INTERESTS[:8]
+    for sectors, paths, occupations in shapes:
+        taxonomy = synthetic_taxonomy(sectors, paths, occupations)
+        taxonomy.top_occupations(interests) # Warm up
+        samples = _time_calls(lambda: taxonomy.top_occupations(interests, k=3), repeat)
+        results.append({
+            "occupations": len(taxonomy),
+            "shape": [sectors, paths, occupations],
+            "latency_ms": {k: v * 1000 for k, v in percentiles(samples).items()}
+        })
+    return results
+
+def bench_format(repeat: int) -> Dict:
+    """Throughput of format_recommendations on a typical three-path result."""
+    recommendations = CareerRecommender()._build_recommendations(SAMPLE_INTERESTS)
+    samples = _time_calls(lambda: format_recommendations(recommendations), repeat)
+    total = sum(samples)
+    return {
+        "latency_us": {k: v * 1e6 for k, v in percentiles(samples).items()},
+        "calls_per_second": repeat / total if total else 0.0
+    }
+
+def bench_turns(server: StubMistralServer, turns: int, sessions: int, incremental: bool) -> Dict:
+    """Full process_response turns against the stub server: latency and tokens sent per turn."""
+    per_turn_latency: Dict[int, List[float]] = {}
+    per_turn_tokens: Dict[int, List[int]] = {}
+    all_latency = []
+    client = PooledMistralClient(api_key="stub", endpoint=server.url)
+    for _ in range(sessions):
+        recommender = CareerRecommender(incremental=incremental, client=client)
+        recommender.start_conversation()
+        for turn in range(1, turns + 1):
+            start = time.perf_counter()
+            recommender.process_response(SAMPLE_TURNS[(turn - 1) % len(SAMPLE_TURNS)])
+            elapsed = time.perf_counter() - start
+            all_latency.append(elapsed)
+            per_turn_latency.setdefault(turn, []).append(elapsed)
+            per_turn_tokens.setdefault(turn, []).append(recommender.token_usage[-1]["prompt_tokens"])
+    return {
+        "mode": "incremental" if incremental else "full_history",
+        "sessions": sessions,
+        "stub_latency_ms": server.latency * 1000,
+        "latency_ms": {k: v * 1000 for k, v in percentiles(all_latency).items()},
+        "per_turn": [
+            {
+                "turn": turn,
+                "latency_ms": {k: v * 1000 for k, v in percentiles(per_turn_latency[turn], (50, 99)).items()},
+                "prompt_tokens": sum(per_turn_tokens[turn]) / len(per_turn_tokens[turn])
+            }
+            for turn in sorted(per_turn_latency)
+        ]
+    }
+
+def compare(current: Dict, baseline: Dict) -> None:
+    """Prints headline deltas between two result files."""
+    def ratio(new: float, old: float) -> str:
+        return f"{(new / old - 1) * 100:+.1f}%" if old else "n/a"
+
+    for new, old in zip(current.get("mapping", []), baseline.get("mapping", [])):
+        print(f"mapping {new['catalog_paths']:>6} paths  p50 {ratio(new['latency_ms']['p50'], old['latency_ms']['p50'])}")
+    for new, old in zip(current.get("taxonomy", []), baseline.get("taxonomy", [])):
+        print(f"taxonomy {new['occupations']:>6} occupations  p50 {ratio(new['latency_ms']['p50'], old['latency_ms']['p50'])}")
+    if "format" in current and "format" in baseline:
+        print(f"format calls/s {ratio(current['format']['calls_per_second'], baseline['format']['calls_per_second'])}")
+    for new, old in zip(current.get("turns", []), baseline.get("turns", [])):
+        print(f"turns ({new['mode']})  p50 {ratio(new['latency_ms']['p50'], old['latency_ms']['p50'])}  "
+              f"p99 {ratio(new['latency_ms']['p99'], old['latency_ms']['p99'])}")
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the career recommender.")
+    parser.add_argument("--catalog-sizes", type=int, nargs="+", default=[6, 100, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per scoring/formatting measurement")
+    parser.add_argument("--turns", type=int, default=10, help="Turns per benchmark conversation")
+    parser.add_argument("--sessions", type=int, default=5, help="Conversations per extraction mode")
+    parser.add_argument("--stub-latency", type=float, default=0.05, help="Seconds the stub server waits per call")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against")
+    args = parser.parse_args(argv)
+
+    results = {
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "mapping": bench_mapping(args.catalog_sizes, args.repeat),
+        "taxonomy": bench_taxonomy([(6, 1, 6), (20, 50, 30)], args.repeat),
+        "format": bench_format(args.repeat)
+    }
+    with StubMistralServer(latency=args.stub_latency) as server:
+        results["turns"] = [
+            bench_turns(server, args.turns, args.sessions, incremental=False),
+            bench_turns(server, args.turns, args.sessions, incremental=True)
+        ]
+
+    for entry in results["mapping"]:
+        print(f"map_interests_to_careers  {entry['catalog_paths']:>6} paths  "
+              f"p50 {entry['latency_ms']['p50']:.3f} ms  {entry['interests_per_second']:,.0f} interests/s")
+    for entry in results["taxonomy"]:
+        print(f"top_occupations  {entry['occupations']:>6} occupations  p50 {entry['latency_ms']['p50']:.3f} ms  "
+              f"p99 {entry['latency_ms']['p99']:.3f} ms")
+    print(f"format_recommendations    p50 {results['format']['latency_us']['p50']:.1f} us  "
+          f"{results['format']['calls_per_second']:,.0f} calls/s")
+    for run in results["turns"]:
+        tokens = " ".join(f"{entry['prompt_tokens']:.0f}" for entry in run["per_turn"])
+        print(f"process_response ({run['mode']})  p50 {run['latency_ms']['p50']:.1f} ms  "
+              f"p99 {run['latency_ms']['p99']:.1f} ms  prompt tokens by turn: {tokens}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(results, json.load(f))
+    return results
+
+if __name__ == "__main__":
+    main()
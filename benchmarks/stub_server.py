@@ -0,0 +1,187 @@
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+DEFAULT_RESPONSE_TEXT = "programming, math, data analysis"
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token) used for stub usage reporting."""
+    return max(1, math.ceil(len(text) / 4))
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024 # Accept bursts of concurrent connections from load tests
+
+class StubMistralServer:
+    """
+    Local stand-in for the Mistral chat completions endpoint.
+
+    Serves POST /v1/chat/completions (plain and streamed) and GET /v1/models with
+    a configurable latency and reply text, and records the token estimate of every
+    request it receives. A fraction `error_rate` of chat requests is answered with
+    `error_status` instead. Use as a context manager; `url` is the endpoint to pass
+    to MistralClient(endpoint=...).
+    """
+
+    def __init__(self, latency: float = 0.0, response_text: str = DEFAULT_RESPONSE_TEXT,
+                 host: str = "127.0.0.1", port: int = 0, stream_chunk_size: int = 8,
+                 error_rate: float = 0.0, error_status: int = 500, seed: Optional[int] = None):
+        self.latency = latency
+        self.response_text = response_text
+        self.stream_chunk_size = stream_chunk_size
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.errors = 0 # Number of injected error responses
+        self.requests: List[Dict] = [] # One record per chat request: prompt tokens and message count
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = _StubHTTPServer((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubMistralServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubMistralServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def reply_for(self, request: Dict) -> str:
+        """Returns the reply text for a request; override for request-dependent replies."""
+        return self.response_text
+
+    def _record(self, request: Dict) -> int:
+        prompt_tokens = sum(estimate_tokens(msg.get("content", "")) for msg in request.get("messages", []))
+        with self._lock:
+            self.requests.append({"prompt_tokens": prompt_tokens, "messages": len(request.get("messages", []))})
+        return prompt_tokens
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return True
+            return False
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True # Avoid delayed-ACK stalls on keep-alive connections
+
+            def log_message(self, format, *args):
+                pass # Keep benchmark output clean
+
+            def _send_json(self, status: int, payload: Dict) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip("/") == "/v1/models":
+                    self._send_json(200, {"object": "list", "data": [{"id": "mistral-medium", "object": "model"}]})
+                else:
+                    self._send_json(404, {"object": "error", "message": "Not found"})
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._send_json(404, {"object": "error", "message": "Not found"})
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                prompt_tokens = stub._record(request)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if stub._should_fail():
+                    self._send_json(stub.error_status, {"object": "error", "message": "Injected failure"})
+                    return
+
+                text = stub.reply_for(request)
+                completion_tokens = estimate_tokens(text)
+                usage = {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }
+                completion_id = f"cmpl-{uuid.uuid4().hex[:12]}"
+                model = request.get("model", "mistral-medium")
+
+                if not request.get("stream"):
+                    self._send_json(200, {
+                        "id": completion_id,
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                        "usage": usage
+                    })
+                    return
+
+                # Server-sent events, one chunk per slice of the reply, terminated by [DONE]
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                size = stub.stream_chunk_size
+                pieces = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+                for index, piece in enumerate(pieces):
+                    last = index == len(pieces) - 1
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": "stop" if last else None}]
+                    }
+                    if last:
+                        chunk["usage"] = usage
+                    self.wfile.write(b"data: " + json.dumps(chunk).encode("utf-8") + b"\n\n")
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+        return Handler
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local stub of the Mistral chat endpoint.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering each request")
+    parser.add_argument("--response-text", default=DEFAULT_RESPONSE_TEXT)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of chat requests answered with an error")
+    args = parser.parse_args()
+
+    server = StubMistralServer(latency=args.latency, response_text=args.response_text, port=args.port,
+                               error_rate=args.error_rate)
+    print(f"Stub Mistral endpoint listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from batch_scoring import BatchScorer
+from career_paths import get_career_description, get_career_options, get_career_roadmap
+from career_recommender import chat_message
+from extraction_cache import ExtractionCache, make_cache_key
+from metrics import Metrics, get_metrics
+from prompt_templates import get_extract_interests_prompt
+from report_rendering import FORMATS, ReportWriter
+from request_scheduler import TokenBucket
+
+CHECKPOINT_FORMAT_VERSION = 1
+
+class ExtractionOutage(RuntimeError):
+    """Too many records in a row failed; the run stopped so a rerun can retry them."""
+
+OUTPUT_EXTENSIONS = {".jsonl": "json", ".json": "json", ".csv": "csv", ".md": "markdown", ".html": "html", ".htm": "html", ".txt": "text"}
+
+def detect_format(path: str, explicit: Optional[str] = None) -> str:
+    if explicit:
+        return explicit
+    return "csv" if os.path.splitext(path)[1].lower() == ".csv" else "jsonl"
+
+def detect_output_format(path: str, explicit: Optional[str] = None) -> str:
+    return explicit or OUTPUT_EXTENSIONS.get(os.path.splitext(path)[1].lower(), "json")
+
+def recommendation(path: str, confidence: float) -> Dict:
+    """Report entry for a scored path, with the same fields as interactive recommendations."""
+    return {
+        "path": path,
+        "confidence": confidence,
+        "description": get_career_description(path),
+        "careers": get_career_options(path),
+        "roadmap": get_career_roadmap(path)
+    }
+
+def read_records(path: str, fmt: str, id_field: str = "id", text_field: str = "response") -> Iterator[Tuple[str, str]]:
+    """Streams (record id, free-text response) pairs; records without an id are numbered by position."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        rows = csv.DictReader(f) if fmt == "csv" else (json.loads(line) for line in f if line.strip())
+        for position, row in enumerate(rows):
+            record_id = row.get(id_field)
+            yield str(record_id if record_id not in (None, "") else position), row.get(text_field) or ""
+
+class CohortExtractor:
+    """
+    One-shot interest extraction for a single free-text response, with the same
+    prompt as the interactive extraction. Calls share one client, are paced by a
+    token bucket and, with a cache, are never paid for twice. A failed call is
+    retried `retries` times, waiting `retry_backoff` seconds and doubling each time.
+    """
+
+    def __init__(self, client=None, cache: Optional[ExtractionCache] = None, bucket: Optional[TokenBucket] = None,
+                 model: str = "mistral-medium", temperature: float = 0.3, retries: int = 3, retry_backoff: float = 1.0,
+                 metrics: Optional[Metrics] = None):
+        self._client = client
+        self.cache = cache
+        self.bucket = bucket
+        self.model = model
+        self.temperature = temperature
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.metrics = metrics or get_metrics()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from client_pool import get_shared_client
+            self._client = get_shared_client()
+        return self._client
+
+    def extract(self, text: str) -> List[str]:
+        if not text.strip():
+            return []
+        messages = [
+            chat_message(role="system", content=get_extract_interests_prompt()),
+            chat_message(role="user", content=text)
+        ]
+        key = make_cache_key(messages, self.model, self.temperature) if self.cache is not None else None
+        content = self.cache.get(key) if key is not None else None
+        if content is None:
+            content = self._call(messages)
+            if key is not None:
+                self.cache.set(key, content)
+        return [interest.strip() for interest in content.split(",") if interest.strip()]
+
+    def _call(self, messages: List) -> str:
+        for attempt in range(self.retries + 1):
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                with self.metrics.timer("bulk.llm_call"):
+                    response = self.client.chat(model=self.model, messages=messages, temperature=self.temperature)
+                return response.choices[0].message.content
+            except Exception:
+                if attempt == self.retries:
+                    raise
+                self.metrics.incr("bulk.retries")
+                time.sleep(self.retry_backoff * 2 ** attempt)
+
+def load_checkpoint(path: str) -> Optional[Dict]:
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("format") != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported checkpoint format: {checkpoint.get('format')}")
+    return checkpoint
+
+def save_checkpoint(path: str, checkpoint: Dict) -> None:
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(temp_path, path) # A crash mid-write leaves the previous checkpoint intact
+
+def run_cohort(input_path: str, output_path: str, extractor: CohortExtractor, input_format: Optional[str] = None,
+               output_format: Optional[str] = None, id_field: str = "id", text_field: str = "response",
+               workers: int = 8, batch_size: int = 256, top_k: int = 3, checkpoint_path: Optional[str] = None,
+               resume: bool = True, max_consecutive_failures: int = 10, progress: bool = True) -> Dict:
+    """
+    Extracts, scores and writes every record of a cohort file, in input order.
+
+    At most `workers * 4` records are in flight, so memory stays flat however large
+    the input is. Extraction results are scored in batches of `batch_size`; after
+    each batch is written the output is synced and a checkpoint records how many
+    records are done and the output size. A resumed run truncates the output back
+    to that size and skips those records, so only the unfinished batch is redone.
+
+    A record whose extraction still fails after the extractor's retries is written
+    with its error. When `max_consecutive_failures` records fail in a row, the
+    provider is treated as down: the records before the streak are checkpointed and
+    ExtractionOutage is raised, so a rerun resumes at the first failed record.
+    """
+    input_format = detect_format(input_path, input_format)
+    output_format = detect_output_format(output_path, output_format)
+    checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+    input_size = os.path.getsize(input_path)
+
+    checkpoint = load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is not None:
+        if checkpoint["input"] != os.path.abspath(input_path) or checkpoint["input_size"] != input_size:
+            raise ValueError(f"Checkpoint {checkpoint_path} belongs to a different input; rerun without resuming")
+        output_size = os.path.getsize(output_path) if os.path.exists(output_path) else -1
+        if output_size < checkpoint["output_bytes"]:
+            if progress:
+                print(f"{output_path} is missing or shorter than its checkpoint; starting over", file=sys.stderr)
+            checkpoint = None
+    if checkpoint is not None:
+        with open(output_path, "r+b") as f:
+            f.truncate(checkpoint["output_bytes"]) # Drop rows written after the last checkpoint
+        done, errors = checkpoint["records"], checkpoint["errors"]
+    else:
+        open(output_path, "w").close()
+        done, errors = 0, 0
+    resumed_at = done
+
+    scorer = BatchScorer()
+    output = open(output_path, "a", encoding="utf-8", newline="")
+    writer = ReportWriter(output, output_format)
+    if output.tell() == 0:
+        writer.begin() # HTML page head or CSV header; a resumed file already has it
+    records = itertools.islice(read_records(input_path, input_format, id_field, text_field), done, None)
+    pending: "deque[Tuple[str, Future]]" = deque()
+    batch: List[Tuple[str, List[str], Optional[str]]] = []
+    streak = 0 # Failed records in a row, all still in `batch`
+    started = time.perf_counter()
+
+    def sync_output() -> int:
+        # Flushed to disk before the checkpoint claims it; the size is where a resumed run truncates to
+        output.flush()
+        os.fsync(output.fileno())
+        return output.tell()
+
+    def flush_batch() -> None:
+        nonlocal done, errors
+        with extractor.metrics.timer("bulk.score"):
+            scores = scorer.score([interests for _, interests, _ in batch], top_k)
+        for row, (record_id, interests, error) in enumerate(batch):
+            # Same 1% floor as the interactive recommendations
+            recommendations = [recommendation(path, confidence) for path, confidence in scores.top_matches(row) if confidence > 0.01]
+            writer.write(recommendations, record_id, interests, error)
+        done += len(batch)
+        errors += sum(1 for _, _, error in batch if error)
+        batch.clear()
+        save_checkpoint(checkpoint_path, {
+            "format": CHECKPOINT_FORMAT_VERSION,
+            "input": os.path.abspath(input_path),
+            "input_size": input_size,
+            "records": done,
+            "errors": errors,
+            "output_bytes": sync_output()
+        })
+        extractor.metrics.gauge("bulk.records_done", done)
+        if progress:
+            rate = (done - resumed_at) / max(time.perf_counter() - started, 1e-9)
+            print(f"{done} records done ({rate:.1f}/s, {errors} errors)", file=sys.stderr)
+
+    def collect(record_id: str, future: Future) -> None:
+        nonlocal streak
+        try:
+            batch.append((record_id, future.result(), None))
+            streak = 0
+        except Exception as e:
+            batch.append((record_id, [], f"{type(e).__name__}: {e}"))
+            streak += 1
+            if max_consecutive_failures and streak >= max_consecutive_failures:
+                del batch[len(batch) - streak:] # Not written or checkpointed, so a rerun retries them
+                if batch:
+                    flush_batch()
+                raise ExtractionOutage(f"{streak} records in a row failed (last: {type(e).__name__}: {e}); "
+                                       f"stopped after {done} records, rerun to resume")
+        if len(batch) >= batch_size and not streak: # A streak is held back until it ends or becomes an outage
+            flush_batch()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="cohort") as pool:
+        try:
+            for record_id, text in records:
+                pending.append((record_id, pool.submit(extractor.extract, text)))
+                if len(pending) >= workers * 4: # Bounded window keeps reading in step with extraction
+                    collect(*pending.popleft())
+            while pending:
+                collect(*pending.popleft())
+            if batch:
+                flush_batch()
+            writer.end() # Written after the last checkpoint, so a rerun drops and rewrites it
+        finally:
+            for _, future in pending:
+                future.cancel()
+            output.close()
+
+    return {
+        "records": done,
+        "processed": done - resumed_at,
+        "resumed_at": resumed_at,
+        "errors": errors,
+        "elapsed_s": time.perf_counter() - started
+    }
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Extract interests and score career paths for a whole cohort file.")
+    parser.add_argument("input", help="JSONL or CSV file of responses")
+    parser.add_argument("output", help="Results file: JSONL, CSV, Markdown, HTML or text report (format from the extension)")
+    parser.add_argument("--input-format", choices=["jsonl", "csv"])
+    parser.add_argument("--output-format", choices=FORMATS)
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--text-field", default="response")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent extraction calls")
+    parser.add_argument("--rate", type=float, default=5.0, help="Maximum LLM requests per second")
+    parser.add_argument("--burst", type=float, help="Token bucket capacity (defaults to the rate)")
+    parser.add_argument("--batch-size", type=int, default=256, help="Records scored, written and checkpointed together")
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: OUTPUT.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start over")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per failed extraction, with exponential backoff")
+    parser.add_argument("--max-consecutive-failures", type=int, default=10,
+                        help="Stop (resumably) when this many records fail in a row; 0 never stops")
+    parser.add_argument("--cache-path", help="SQLite extraction cache, so even redone records skip the LLM")
+    parser.add_argument("--replay-from", help="Answer extraction requests from a recorded fixture (see llm_recording.py)")
+    parser.add_argument("--record-to", help="Record every extraction request and response to a fixture")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    client = None
+    if args.replay_from:
+        from llm_recording import ReplayClient
+        client = ReplayClient(args.replay_from)
+    elif args.record_to:
+        from client_pool import get_shared_client
+        from llm_recording import RecordingClient
+        client = RecordingClient(get_shared_client(), args.record_to)
+    extractor = CohortExtractor(
+        client=client,
+        cache=ExtractionCache(max_entries=args.workers * 16, ttl_seconds=30 * 24 * 3600, disk_path=args.cache_path)
+        if args.cache_path else None,
+        bucket=TokenBucket(args.rate, args.burst),
+        retries=0 if args.replay_from else args.retries # A replay miss will not succeed on retry
+    )
+    try:
+        result = run_cohort(
+            args.input, args.output, extractor,
+            input_format=args.input_format, output_format=args.output_format,
+            id_field=args.id_field, text_field=args.text_field,
+            workers=args.workers, batch_size=args.batch_size, top_k=args.top_k,
+            checkpoint_path=args.checkpoint, resume=not args.restart,
+            max_consecutive_failures=args.max_consecutive_failures
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    except ExtractionOutage as e:
+        parser.exit(1, f"{parser.prog}: {e}\n")
+    print(f"{result['processed']} records processed ({result['resumed_at']} already done), "
+          f"{result['errors']} errors, {result['elapsed_s']:.1f}s")
+    return result
+
+if __name__ == "__main__":
+    main()
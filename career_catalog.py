@@ -0,0 +1,295 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import weakref
+from typing import Any, Callable, Dict, List, Optional
+
+from keyword_matcher import KeywordMatcher
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+def catalog_version(mapping: Dict[str, Dict]) -> str:
+    """Content hash identifying a catalog revision."""
+    payload = json.dumps(mapping, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+class CareerCatalog:
+    """
+    Indexed, read-only career catalog.
+
+    Only path names and keywords are needed to build the keyword index; each
+    path's description, careers and roadmap are fetched through a loader on first
+    use and then served from a dict, so lookups are O(1).
+    """
+
+    def __init__(self, path_keywords: Dict[str, List[str]], load_details: Callable[[str], Dict], version: str):
+        self.paths: List[str] = list(path_keywords.keys())
+        self.path_index: Dict[str, int] = {path: index for index, path in enumerate(self.paths)} # Catalog order
+        self.path_keywords = path_keywords
+        self.version = version
+        self.matcher = KeywordMatcher.from_path_keywords(path_keywords)
+        self._load_details = load_details
+        self._details: Dict[str, Dict] = {}
+        self._derived: Dict[str, Any] = {} # Indexes built from this catalog on demand, see derived()
+        self._lock = threading.Lock()
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.path_keywords
+
+    def details(self, path: str) -> Dict:
+        """Returns the description, careers and roadmap of a path, loading them on first use."""
+        details = self._details.get(path)
+        if details is None:
+            if path not in self.path_keywords:
+                return {}
+            with self._lock:
+                details = self._details.get(path)
+                if details is None:
+                    details = self._load_details(path)
+                    self._details[path] = details
+        return details
+
+    def derived(self, name: str, build: Callable[["CareerCatalog"], Any]) -> Any:
+        """
+        Returns an index derived from this catalog (e.g. a differently normalized
+        matcher), building it once per catalog so every session in the process shares it.
+        """
+        value = self._derived.get(name)
+        if value is None:
+            with self._lock:
+                value = self._derived.get(name)
+                if value is None:
+                    value = build(self)
+                    self._derived[name] = value
+        return value
+
+    def description(self, path: str) -> str:
+        return self.details(path).get("description", "No description available.")
+
+    def careers(self, path: str) -> List[str]:
+        return self.details(path).get("careers", [])
+
+    def roadmap(self, path: str) -> List[str]:
+        return self.details(path).get("roadmap", [])
+
+    def as_mapping(self) -> Dict[str, Dict]:
+        """Materializes the whole catalog as a CAREER_PATHS-style dict."""
+        return {path: {"keywords": self.path_keywords[path], **self.details(path)} for path in self.paths}
+
+    # --- Loaders ---
+
+    @classmethod
+    def from_mapping(cls, mapping: Dict[str, Dict], version: Optional[str] = None) -> "CareerCatalog":
+        """Builds a catalog from a CAREER_PATHS-style dict."""
+        path_keywords = {path: list(data.get("keywords", [])) for path, data in mapping.items()}
+        details = {
+            path: {key: value for key, value in data.items() if key != "keywords"}
+            for path, data in mapping.items()
+        }
+        return cls(path_keywords, details.__getitem__, version or catalog_version(mapping))
+
+    @classmethod
+    def from_json(cls, file_path: str) -> "CareerCatalog":
+        """Loads {"version": ..., "paths": {...}} or a bare CAREER_PATHS-style JSON object."""
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if "paths" in data and isinstance(data["paths"], dict):
+            return cls.from_mapping(data["paths"], data.get("version"))
+        return cls.from_mapping(data)
+
+    @classmethod
+    def from_sqlite(cls, file_path: str) -> "CareerCatalog":
+        """Loads the keyword index from SQLite; details are queried per path on demand."""
+        connection = sqlite3.connect(file_path, check_same_thread=False)
+        try:
+            version_row = connection.execute("SELECT value FROM catalog_meta WHERE key = 'version'").fetchone()
+            path_keywords = {
+                name: json.loads(keywords)
+                for name, keywords in connection.execute("SELECT name, keywords FROM career_paths ORDER BY position")
+            }
+        except Exception:
+            connection.close()
+            raise
+
+        def load_details(path: str) -> Dict:
+            description, careers, roadmap = connection.execute(
+                "SELECT description, careers, roadmap FROM career_paths WHERE name = ?", (path,)
+            ).fetchone()
+            return {"description": description, "careers": json.loads(careers), "roadmap": json.loads(roadmap)}
+
+        catalog = cls(path_keywords, load_details, version_row[0] if version_row else "unknown")
+        # Closed once the catalog is dropped, e.g. after a reload, when no reader can still need its details
+        weakref.finalize(catalog, connection.close)
+        return catalog
+
+    @classmethod
+    def from_snapshot(cls, file_path: str) -> "CareerCatalog":
+        """Loads a compact binary snapshot; per-path details stay pickled until first use."""
+        with open(file_path, "rb") as f:
+            snapshot = pickle.load(f)
+        if snapshot.get("format") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog snapshot format: {snapshot.get('format')}")
+        packed = snapshot["details"]
+        return cls(snapshot["path_keywords"], lambda path: pickle.loads(packed[path]), snapshot["version"])
+
+    @classmethod
+    def load(cls, file_path: str) -> "CareerCatalog":
+        """Loads a catalog file, choosing the format from its extension."""
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == ".json":
+            return cls.from_json(file_path)
+        if extension in (".db", ".sqlite", ".sqlite3"):
+            return cls.from_sqlite(file_path)
+        if extension in (".pkl", ".snapshot"):
+            return cls.from_snapshot(file_path)
+        raise ValueError(f"Unsupported catalog format: {file_path}")
+
+    # --- Writers ---
+
+    def save(self, file_path: str) -> None:
+        """Writes the catalog to JSON, SQLite or a binary snapshot, chosen by extension."""
+        extension = os.path.splitext(file_path)[1].lower()
+        temp_path = file_path + ".tmp"
+        if extension == ".json":
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": self.version, "paths": self.as_mapping()}, f, indent=2)
+        elif extension in (".db", ".sqlite", ".sqlite3"):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            connection = sqlite3.connect(temp_path)
+            connection.execute("CREATE TABLE catalog_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            connection.execute(
+                "CREATE TABLE career_paths (name TEXT PRIMARY KEY, position INTEGER NOT NULL, keywords TEXT NOT NULL, "
+                "description TEXT NOT NULL, careers TEXT NOT NULL, roadmap TEXT NOT NULL)"
+            )
+            connection.execute("INSERT INTO catalog_meta VALUES ('version', ?)", (self.version,))
+            connection.executemany(
+                "INSERT INTO career_paths VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (path, position, json.dumps(self.path_keywords[path]), self.description(path),
+                     json.dumps(self.careers(path)), json.dumps(self.roadmap(path)))
+                    for position, path in enumerate(self.paths)
+                ]
+            )
+            connection.commit()
+            connection.close()
+        elif extension in (".pkl", ".snapshot"):
+            snapshot = {
+                "format": SNAPSHOT_FORMAT_VERSION,
+                "version": self.version,
+                "path_keywords": self.path_keywords,
+                "details": {path: pickle.dumps(self.details(path), protocol=pickle.HIGHEST_PROTOCOL) for path in self.paths}
+            }
+            with open(temp_path, "wb") as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            raise ValueError(f"Unsupported catalog format: {file_path}")
+        os.replace(temp_path, file_path) # Readers never see a half-written catalog
+
+class CatalogStore:
+    """
+    Holds the active catalog and supports atomic hot reload.
+
+    The catalog is built on first access, once per process. A reload builds the
+    new catalog and its index completely before swapping the reference, so
+    concurrent readers always see either the old or the new catalog. A failed
+    reload keeps the current catalog and source. watch() polls the source file
+    and reloads it when it changes.
+    """
+
+    def __init__(self, source: Optional[str] = None, default: Optional[Dict[str, Dict]] = None):
+        self.source = source
+        self._default = default or {}
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._catalog: Optional[CareerCatalog] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+    @property
+    def catalog(self) -> CareerCatalog:
+        catalog = self._catalog
+        if catalog is None:
+            with self._lock:
+                if self._catalog is None:
+                    self._catalog = self._build(self.source)
+                catalog = self._catalog
+        return catalog
+
+    def _build(self, source: Optional[str]) -> CareerCatalog:
+        if not source:
+            return CareerCatalog.from_mapping(self._default)
+        mtime = os.path.getmtime(source) # Read first: a write during the load triggers another reload
+        catalog = CareerCatalog.load(source)
+        self._mtime = mtime # Only after a successful load, so a failed one is retried
+        return catalog
+
+    def reload(self, source: Optional[str] = None) -> CareerCatalog:
+        """Rebuilds the catalog, optionally from a new source, and swaps it in atomically."""
+        with self._lock:
+            source = self.source if source is None else source
+            catalog = self._build(source)
+            self.source = source
+            self._catalog = catalog
+        return catalog
+
+    def swap(self, catalog: CareerCatalog) -> CareerCatalog:
+        """Installs an already built catalog and returns the previous one."""
+        previous = self.catalog
+        with self._lock:
+            self._catalog = catalog
+        return previous
+
+    def reload_if_changed(self) -> bool:
+        """Reloads when the source file was modified since the last load."""
+        if not self.source or not os.path.exists(self.source) or self._catalog is None:
+            return False # Not loaded yet: the first access reads the current file anyway
+        if os.path.getmtime(self.source) == self._mtime:
+            return False
+        self.reload()
+        return True
+
+    def watch(self, interval: float = 30.0) -> threading.Thread:
+        """Starts a daemon thread calling reload_if_changed() every `interval` seconds; one per store."""
+        with self._lock:
+            if self._watcher is None or not self._watcher.is_alive():
+                self._stop_watching.clear()
+                self._watcher = threading.Thread(target=self._watch, args=(interval,), name="catalog-watcher", daemon=True)
+                self._watcher.start()
+            return self._watcher
+
+    def stop_watching(self) -> None:
+        self._stop_watching.set()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop_watching.wait(interval):
+            try:
+                if self.reload_if_changed():
+                    logger.info("Reloaded career catalog %s (version %s)", self.source, self._catalog.version)
+            except Exception:
+                # The current catalog stays active; the next check retries
+                logger.warning("Could not reload the career catalog from %s", self.source, exc_info=True)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export the built-in career catalog to JSON, SQLite or a binary snapshot.")
+    parser.add_argument("output", help="Destination file (.json, .db/.sqlite or .pkl/.snapshot)")
+    parser.add_argument("--source", help="Catalog file to convert instead of the built-in CAREER_PATHS")
+    args = parser.parse_args()
+
+    if args.source:
+        catalog = CareerCatalog.load(args.source)
+    else:
+        from career_paths import CAREER_PATHS
+        catalog = CareerCatalog.from_mapping(CAREER_PATHS)
+    catalog.save(args.output)
+    print(f"Wrote {len(catalog.paths)} career paths (version {catalog.version}) to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,9 @@
-from typing import Dict, List, Tuple
+import heapq
+import itertools
+import os
+from typing import Dict, List, Optional, Tuple
+
+from career_catalog import CareerCatalog, CatalogStore
 
 CAREER_PATHS = {
     "STEM": {
@@ -145,19 +150,37 @@ CAREER_PATHS = {
     }
 }
 
-def map_interests_to_careers(interests: List[str]) -> List[Tuple[str, float]]:
+# Active catalog. Defaults to CAREER_PATHS; set CAREER_CATALOG_PATH to load a JSON, SQLite or snapshot file instead.
+# The keyword index is compiled once per load, so scanning an interest no longer depends on catalog size.
+CATALOG_STORE = CatalogStore(os.getenv("CAREER_CATALOG_PATH"), default=CAREER_PATHS)
+
+def get_catalog() -> CareerCatalog:
+    """Returns the currently active career catalog."""
+    return CATALOG_STORE.catalog
+
+def reload_catalog() -> CareerCatalog:
+    """Atomically reloads the catalog from its source without a restart."""
+    return CATALOG_STORE.reload()
+
+def watch_catalog(interval: float = 30.0) -> bool:
+    """Reloads the catalog whenever its source file changes, checked every `interval` seconds; False without a source file."""
+    if not CATALOG_STORE.source or interval <= 0:
+        return False
+    CATALOG_STORE.watch(interval)
+    return True
+
+def map_interests_to_careers(interests: List[str], top_k: Optional[int] = None) -> List[Tuple[str, float]]:
     """
     Maps a list of interests to potential career paths with confidence scores.
-    Returns a list of tuples (career_path, confidence_score).
+    Returns a list of tuples (career_path, confidence_score); with top_k, only the
+    best top_k, selected with a heap instead of sorting every path.
     """
-    scores = {path: 0 for path in CAREER_PATHS.keys()}
-    
-    for interest in interests:
-        interest = interest.lower()
-        for path, data in CAREER_PATHS.items():
-            for keyword in data["keywords"]:
-                if keyword in interest:
-                    scores[path] += 1
+    catalog = get_catalog()
+    if top_k is None:
+        scores = {path: 0 for path in catalog.paths}
+        catalog.matcher.path_hits(interests, scores)
+    else:
+        scores = catalog.matcher.path_hits(interests) # Only the paths that were hit
     
     # Normalize scores
     total_matches = sum(scores.values())
@@ -165,16 +188,25 @@ def map_interests_to_careers(interests: List[str]) -> List[Tuple[str, float]]:
         scores = {path: score/total_matches for path, score in scores.items()}
     
     # Sort by confidence score
-    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    if top_k is None:
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+    # Ties keep catalog order, as in the full sort; a heap over the hit paths avoids touching the rest
+    index = catalog.path_index
+    ranked = heapq.nlargest(top_k, scores.items(), key=lambda x: (x[1], -index[x[0]]))
+    if len(ranked) < top_k:
+        zero = 0.0 if total_matches > 0 else 0
+        padding = (path for path in catalog.paths if path not in scores)
+        ranked.extend((path, zero) for path in itertools.islice(padding, top_k - len(ranked)))
+    return ranked
 
 def get_career_description(path: str) -> str:
     """Returns the description for a given career path."""
-    return CAREER_PATHS.get(path, {}).get("description", "No description available.")
+    return get_catalog().description(path)
 
 def get_career_options(path: str) -> List[str]:
     """Returns the list of career options for a given path."""
-    return CAREER_PATHS.get(path, {}).get("careers", [])
+    return get_catalog().careers(path)
 
 def get_career_roadmap(path: str) -> List[str]:
     """Returns the roadmap for a given career path."""
-    return CAREER_PATHS.get(path, {}).get("roadmap", []) 
\ No newline at end of file
+    return get_catalog().roadmap(path)
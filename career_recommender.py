@@ -1,36 +1,157 @@
-import os
-from typing import List, Dict, Tuple
-from dotenv import load_dotenv
-from mistralai.client import MistralClient
-from mistralai.models.chat_completion import ChatMessage
+import functools
+import logging
+import time
+import uuid
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
 from prompt_templates import (
     get_initial_prompt,
     get_follow_up_prompt,
     get_clarifying_question,
     get_extract_interests_prompt,
+    get_extract_interests_incremental_prompt,
+    get_incremental_extraction_message,
     get_career_path_explanation_prompt
 )
 from career_paths import (
+    get_catalog,
     map_interests_to_careers,
     get_career_description,
     get_career_options,
     get_career_roadmap
 )
+from extraction_cache import ExtractionCache, make_cache_key
+from explanation_service import ExplanationService
+from history_budget import HistoryBudget
+from interest_extractors import InterestExtractor, KeywordInterestExtractor
+from metrics import Metrics, get_metrics
+from report_rendering import render_report
+from request_scheduler import ExtractionScheduler
+from resilience import ResilientCaller
+from score_accumulator import ScoreAccumulator
 
-load_dotenv()
+if TYPE_CHECKING:
+    from mistralai.models.chat_completion import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+STATE_FORMAT_VERSION = 1 # Layout of CareerRecommender.to_state(); bump when it changes
+
+def chat_message(role: str, content: str) -> "ChatMessage":
+    # The SDK (pydantic, requests, aiohttp) is imported on the first LLM request, not at import time
+    from mistralai.models.chat_completion import ChatMessage
+    return ChatMessage(role=role, content=content)
 
 class CareerRecommender:
-    def __init__(self):
-        self.client = MistralClient(
-            api_key=os.getenv("MISTRAL_API_KEY")
-        )
+    def __init__(self, incremental: bool = False, cache: Optional[ExtractionCache] = None,
+                 extractor: Optional[InterestExtractor] = None, metrics: Optional[Metrics] = None,
+                 client=None, scheduler: Optional[ExtractionScheduler] = None,
+                 session_id: Optional[str] = None, priority: int = 0,
+                 resilience: Optional[ResilientCaller] = None, history_budget: Optional[HistoryBudget] = None,
+                 accumulate_scores: bool = False, score_decay: float = 1.0,
+                 explanations: Optional[ExplanationService] = None, record_to: Optional[str] = None,
+                 replay_from: Optional[str] = None, replay_latency: bool = False):
+        if client is not None and replay_from is not None:
+            raise ValueError("Pass either client or replay_from; a replayed session sends no requests to a client.")
+        # Defaults to the process-wide pooled client, created on first LLM use so sessions start instantly
+        self._client = client
+        self.model = "mistral-medium"
+        self.temperature = 0.3 # Lower temperature for more deterministic extraction
         self.conversation_history = []
+        self.incremental = incremental # Send only the newest turn plus the running interest state
+        self.interest_state: List[str] = [] # Running interest list used by incremental extraction and the budget ledger
+        self.token_usage: List[Dict] = [] # Per-turn token counts of the extraction calls
+        self.cache = cache # Optional cache of extraction replies, shared across sessions
+        self.extractor = extractor # Optional local extractor tried before the LLM
+        self.metrics = metrics or get_metrics() # Per-stage timers and counters
+        self.scheduler = scheduler # Optional shared rate limiter / request coalescer for LLM calls
+        self.session_id = session_id or uuid.uuid4().hex # Identifies this session to the scheduler's fair queue
+        self.priority = priority # Scheduler priority; lower values are served first
+        self.record_to = record_to # Optional JSONL fixture every LLM request and response is appended to
+        self.replay_from = replay_from # Optional fixture that answers LLM requests instead of Mistral
+        self.replay_latency = replay_latency # Reproduce the recorded call durations when replaying
+        if client is not None and record_to is not None:
+            self._client = self._recording(client)
+        self.resilience = resilience # Optional deadline / hedging / circuit breaker around LLM calls
+        self.fallback_extractor: Optional[InterestExtractor] = None # Built on first degraded turn
+        self.degraded_turns = 0 # Turns answered by the keyword fallback because the provider failed
+        self.history_budget = history_budget # Optional token budget for full-history extraction requests
+        self.last_budget_report: Optional[Dict] = None # How the latest request was fitted into the budget
+        # Optional running per-path scores, updated only with interests not seen before in this session
+        self.score_accumulator = ScoreAccumulator(decay=score_decay) if accumulate_scores else None
+        self.explanations = explanations # Optional LLM explanations, prefetched in the background
+        self.last_matches: List[Tuple[str, float]] = [] # (path, confidence) behind the latest recommendations
         self.last_ai_prompt_content = None # To detect repetitive prompts
         self.last_topic_queried = None # To track the last topic asked about
         self.consecutive_same_topic_count = 0 # To count consecutive questions on the same topic
         self.follow_up_categories = ["interests", "skills", "environment", "values", "lifestyle"] # Categories for cycling prompts
         self.follow_up_category_index = 0 # Index to cycle through categories
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    @client.setter
+    def client(self, client) -> None:
+        self._client = client
+
+    def _create_client(self):
+        if self.replay_from is not None:
+            from llm_recording import ReplayClient # Imported only when recording or replaying
+            return ReplayClient(self.replay_from, replay_latency=self.replay_latency)
+        from client_pool import get_shared_client
+        return self._recording(get_shared_client())
+
+    def _recording(self, client):
+        if self.record_to is None:
+            return client
+        from llm_recording import RecordingClient
+        return RecordingClient(client, self.record_to, session_id=self.session_id)
+
+    def to_state(self) -> Dict:
+        """
+        Compact, JSON-serializable snapshot of the conversation. Configuration (client,
+        cache, extractor, budget...) is not included: the process that resumes the
+        session supplies its own through from_state().
+        """
+        return {
+            "format": STATE_FORMAT_VERSION,
+            "session_id": self.session_id,
+            "history": self.conversation_history,
+            "interests": self.interest_state,
+            "last_prompt": self.last_ai_prompt_content,
+            "topic": self.last_topic_queried,
+            "same_topic": self.consecutive_same_topic_count,
+            "category": self.follow_up_category_index,
+            "matches": [[path, confidence] for path, confidence in self.last_matches],
+            "degraded_turns": self.degraded_turns,
+            "scores": self.score_accumulator.to_state() if self.score_accumulator is not None else None
+        }
+
+    def restore_state(self, state: Dict) -> None:
+        """Replaces this recommender's conversation with a snapshot taken by to_state()."""
+        if state.get("format") != STATE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported session state format: {state.get('format')}")
+        self.session_id = state["session_id"]
+        self.conversation_history = list(state["history"])
+        self.interest_state = list(state["interests"])
+        self.last_ai_prompt_content = state["last_prompt"]
+        self.last_topic_queried = state["topic"]
+        self.consecutive_same_topic_count = state["same_topic"]
+        self.follow_up_category_index = state["category"]
+        self.last_matches = [(path, confidence) for path, confidence in state["matches"]]
+        self.degraded_turns = state["degraded_turns"]
+        if self.score_accumulator is not None and state["scores"] is not None:
+            self.score_accumulator.load_state(state["scores"])
+
+    @classmethod
+    def from_state(cls, state: Dict, **options) -> "CareerRecommender":
+        """Resumes a session in this process; options are the constructor's configuration arguments."""
+        recommender = cls(**options)
+        recommender.restore_state(state)
+        return recommender
         
     def start_conversation(self) -> str:
         """Starts the career guidance conversation."""
@@ -46,26 +167,148 @@ class CareerRecommender:
         Processes user response and returns next prompt and career recommendations.
         Returns a tuple of (next_prompt, career_recommendations)
         """
+        with self.metrics.timer("process_response.total"):
+            self.conversation_history.append({"role": "user", "content": user_response})
+            
+            # Extract interests from the conversation
+            interests = self._extract_interests()
+            
+            recommendations = self._build_recommendations(interests)
+            with self.metrics.timer("prompt.select"):
+                next_prompt = self._select_next_prompt(recommendations)
+            self._finish_turn(next_prompt)
+        return next_prompt, recommendations
+
+    def process_response_stream(self, user_response: str) -> Iterator[Tuple[str, Any]]:
+        """
+        Streaming variant of process_response. Yields (event, payload) tuples as results become available:
+        ("token", text) for each chunk of model output, ("interest", interest) as each interest completes,
+        ("recommendations", recommendations) once scoring is done and finally ("prompt", next_prompt).
+        """
         self.conversation_history.append({"role": "user", "content": user_response})
-        
-        # Extract interests from the conversation
-        interests = self._extract_interests()
-        
+
+        interests = self._extract_interests_locally()
+        if interests is not None:
+            for interest in interests:
+                yield "interest", interest
+        else:
+            with self.metrics.timer("extract.build_messages"):
+                messages = self._build_extraction_messages()
+            cache_key, content = self._lookup_cache(messages)
+            if content is not None:
+                yield "token", content
+                for interest in self._parse_interests(content):
+                    yield "interest", interest
+                interests = self._accept_interests(content)
+            elif self.resilience is not None and not self.resilience.breaker.allow():
+                interests = self._extract_interests_degraded()
+                for interest in interests:
+                    yield "interest", interest
+            else:
+                try:
+                    content = yield from self._stream_extraction(messages, cache_key)
+                except Exception:
+                    if self.resilience is None:
+                        raise
+                    self.resilience.breaker.record_failure()
+                    interests = self._extract_interests_degraded()
+                    for interest in interests:
+                        yield "interest", interest
+                except BaseException:
+                    # GeneratorExit when the consumer closes the turn mid-stream: no outcome to record
+                    if self.resilience is not None:
+                        self.resilience.breaker.release()
+                    raise
+                else:
+                    if self.resilience is not None:
+                        self.resilience.breaker.record_success()
+                    interests = self._accept_interests(content)
+
+        recommendations = self._build_recommendations(interests)
+        yield "recommendations", recommendations
+        with self.metrics.timer("prompt.select"):
+            next_prompt = self._select_next_prompt(recommendations)
+        self._finish_turn(next_prompt)
+        yield "prompt", next_prompt
+
+    def _stream_extraction(self, messages: List["ChatMessage"], cache_key: Optional[str]) -> Iterator[Tuple[str, Any]]:
+        """Streams the extraction call, yielding token and interest events; returns the full reply text."""
+        content = ""
+        emitted = 0 # Number of completed interests already yielded
+        usage = None
+        open_stream = lambda: self.client.chat_stream(model=self.model, messages=messages, temperature=self.temperature)
+        started = time.perf_counter()
+        if self.scheduler is not None:
+            # Queued fairly with the other sessions' calls; identical requests in flight share one stream
+            chunks = self.scheduler.stream(
+                open_stream,
+                key=cache_key or make_cache_key(messages, self.model, self.temperature),
+                session_id=self.session_id,
+                priority=self.priority
+            )
+        else:
+            chunks = open_stream()
+        first_token_at = None
+        for chunk in chunks:
+            usage = chunk.usage or usage
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            if first_token_at is None:
+                first_token_at = time.perf_counter()
+                self.metrics.observe("extract.llm_first_token", first_token_at - started)
+            content += delta
+            yield "token", delta
+            # Everything before the last comma is a finished interest
+            completed = self._parse_interests(content.rsplit(",", 1)[0]) if "," in content else []
+            for interest in completed[emitted:]:
+                yield "interest", interest
+            emitted = max(emitted, len(completed))
+        # Wall time of the stream, including time the consumer spent rendering between chunks
+        self.metrics.observe("extract.llm_call", time.perf_counter() - started)
+        for interest in self._parse_interests(content)[emitted:]:
+            yield "interest", interest
+        return self._store_reply(messages, content, usage, cache_key)
+
+    def _build_recommendations(self, interests: List[str]) -> List[Dict]:
+        """Maps interests to career paths and assembles the top recommendations."""
         # Map interests to career paths
-        career_matches = map_interests_to_careers(interests)
-        
-        # Generate recommendations
-        recommendations = []
-        for path, confidence in career_matches[:3]:  # Top 3 matches
-            if confidence > 0.01:  # Lowered threshold to 1% to get more matches
+        with self.metrics.timer("score.map_interests"):
+            if self.score_accumulator is not None:
+                catalog = get_catalog()
+                if self.score_accumulator.catalog is not catalog:
+                    self.score_accumulator.rebuild(catalog) # The catalog was hot-reloaded
+                self.score_accumulator.add(interests)
+                career_matches = self.score_accumulator.top(3)
+            else:
+                career_matches = map_interests_to_careers(interests, top_k=3)
+        # Top 3 matches; threshold lowered to 1% to get more matches
+        self.last_matches = [(path, confidence) for path, confidence in career_matches[:3] if confidence > 0.01]
+        return self.recommendations_for(self.last_matches)
+
+    def recommendations_for(self, career_matches: List[Tuple[str, float]]) -> List[Dict]:
+        """Builds recommendation entries for (path, confidence) matches, e.g. a restored session's last_matches."""
+        catalog = get_catalog()
+        with self.metrics.timer("recommendations.assemble"):
+            recommendations = []
+            for path, confidence in career_matches:
+                if path not in catalog:
+                    continue # Dropped by a catalog reload since the matches were made
                 recommendations.append({
                     "path": path,
                     "confidence": confidence,
                     "description": get_career_description(path),
                     "careers": get_career_options(path),
-                    "roadmap": get_career_roadmap(path)
+                    "roadmap": get_career_roadmap(path),
+                    "explanation": self.explanations.cached(path) if self.explanations is not None else None
                 })
-        
+        if self.explanations is not None:
+            # Generate missing explanations off the request path; later renders pick them up from the cache
+            self.explanations.prefetch(rec["path"] for rec in recommendations if rec["explanation"] is None)
+        return recommendations
+
+    def _select_next_prompt(self, recommendations: List[Dict]) -> str:
+        """Chooses the follow-up prompt and advances the topic-tracking state machine."""
         # Determine the next prompt based on recommendations
         next_prompt = ""
         if not recommendations:
@@ -103,54 +346,265 @@ class CareerRecommender:
                 self.consecutive_same_topic_count = 0 # Reset topic counter too for this hard reset
                 self.last_topic_queried = None
                 self.follow_up_category_index = 0 # Reset index after a hard break
-        
+        return next_prompt
+
+    def _finish_turn(self, next_prompt: str) -> None:
+        """Records the assistant prompt that closes the current turn."""
         self.last_ai_prompt_content = next_prompt # Store this prompt for the next turn
+        if self.score_accumulator is not None:
+            self.score_accumulator.advance_turn()
         self.conversation_history.append({"role": "assistant", "content": next_prompt})
-        return next_prompt, recommendations
     
     def _extract_interests(self) -> List[str]:
-        """Extracts interests from the entire conversation history using Mistral AI."""
+        """Extracts interests from the conversation, using Mistral AI unless the local extractor answers."""
+        interests = self._extract_interests_locally()
+        if interests is not None:
+            return interests
+
+        with self.metrics.timer("extract.build_messages"):
+            messages = self._build_extraction_messages()
+        try:
+            content = self._complete(messages)
+        except Exception:
+            if self.resilience is None:
+                raise
+            return self._extract_interests_degraded()
+        return self._accept_interests(content)
+
+    def _extract_interests_locally(self) -> Optional[List[str]]:
+        """Runs the pluggable local extractor; None means the turn needs the LLM."""
+        if self.extractor is None:
+            return None
+        with self.metrics.timer("extract.local"):
+            interests = self.extractor.extract(self.conversation_history)
+        if interests is None:
+            return None
+        self.metrics.incr("extract.local_turns")
+        return self._merge_local_interests(interests)
+
+    def _extract_interests_degraded(self) -> List[str]:
+        """Deterministic keyword extraction over the history, used while the provider is unhealthy."""
+        logger.warning("Mistral call failed or circuit open; falling back to keyword extraction")
+        if self.fallback_extractor is None:
+            self.fallback_extractor = KeywordInterestExtractor()
+        self.degraded_turns += 1
+        self.metrics.incr("extract.fallback_turns")
+        return self._merge_local_interests(self.fallback_extractor.extract(self.conversation_history) or [])
+
+    def _merge_local_interests(self, interests: List[str]) -> List[str]:
+        if self.incremental:
+            # Keep interests the LLM found on earlier turns in the running state
+            known = {interest.lower() for interest in self.interest_state}
+            interests = self.interest_state + [i for i in interests if i.lower() not in known]
+            self.interest_state = interests
+        elif self.history_budget is not None:
+            self.interest_state = interests # Ledger that stands in for folded turns
+        return interests
+
+    def _accept_interests(self, content: str) -> List[str]:
+        """Parses the extraction reply and updates the running interest state."""
+        # Clean and split the response
+        with self.metrics.timer("extract.parse"):
+            interests = self._parse_interests(content)
+        logger.debug("Extracted interests from Mistral: %s", interests)
+        if self.incremental or self.history_budget is not None:
+            self.interest_state = interests
+        return interests
+
+    def _build_extraction_messages(self) -> List["ChatMessage"]:
+        """Builds the message list for the extraction call."""
+        if self.incremental:
+            # Compact state plus the newest user turn keeps the request size flat across the session
+            latest_user_message = next(
+                (msg["content"] for msg in reversed(self.conversation_history) if msg["role"] == "user"), ""
+            )
+            return [
+                chat_message(role="system", content=get_extract_interests_incremental_prompt()),
+                chat_message(role="user", content=get_incremental_extraction_message(self.interest_state, latest_user_message))
+            ]
+
+        if self.history_budget is not None:
+            # Recent turns verbatim, older ones folded into a summary so the request stays within budget
+            fitted, self.last_budget_report = self.history_budget.fit(
+                get_extract_interests_prompt(), self.conversation_history, self.interest_state
+            )
+            return [chat_message(role=msg["role"], content=msg["content"]) for msg in fitted]
+
         messages = []
         # Add system message first
-        messages.append(ChatMessage(role="system", content=get_extract_interests_prompt()))
+        messages.append(chat_message(role="system", content=get_extract_interests_prompt()))
         
         # Add entire conversation history
         for msg in self.conversation_history:
-            messages.append(ChatMessage(role=msg["role"], content=msg["content"])) # Re-add all messages
-        
-        response = self.client.chat(
-            model="mistral-medium",
-            messages=messages,
-            temperature=0.3 # Lower temperature for more deterministic extraction
+            messages.append(chat_message(role=msg["role"], content=msg["content"])) # Re-add all messages
+        return messages
+
+    def _complete(self, messages: List["ChatMessage"]) -> str:
+        """Sends the messages to Mistral AI and returns the reply text, serving repeats from the cache."""
+        cache_key, cached = self._lookup_cache(messages)
+        if cached is not None:
+            return cached
+
+        def call():
+            return self.client.chat(model=self.model, messages=messages, temperature=self.temperature)
+
+        if self.resilience is not None:
+            upstream = call
+            call = lambda: self.resilience.call(upstream)
+
+        with self.metrics.timer("extract.llm_call"):
+            if self.scheduler is not None:
+                response = self.scheduler.submit(
+                    call,
+                    key=cache_key or make_cache_key(messages, self.model, self.temperature),
+                    session_id=self.session_id,
+                    priority=self.priority
+                )
+            else:
+                response = call()
+        return self._accept_response(messages, response, cache_key)
+
+    def _lookup_cache(self, messages: List["ChatMessage"]) -> Tuple[Optional[str], Optional[str]]:
+        """Returns (cache_key, cached_reply); both are None when no cache is configured."""
+        if self.cache is None:
+            return None, None
+        cache_key = make_cache_key(messages, self.model, self.temperature)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.metrics.incr("llm.cache_hits")
+            self._record_token_usage(len(messages), None, cached=True)
+        return cache_key, cached
+
+    def _accept_response(self, messages: List["ChatMessage"], response, cache_key: Optional[str]) -> str:
+        """Records usage for a chat response, stores it in the cache and returns its text."""
+        return self._store_reply(messages, response.choices[0].message.content, response.usage, cache_key)
+
+    def _store_reply(self, messages: List["ChatMessage"], content: str, usage, cache_key: Optional[str]) -> str:
+        self.metrics.incr("llm.calls")
+        self._record_token_usage(len(messages), usage)
+        if cache_key is not None:
+            self.cache.set(cache_key, content)
+        return content
+
+    def _record_token_usage(self, message_count: int, usage, cached: bool = False) -> None:
+        """Stores the token counts reported for this turn's extraction call."""
+        entry = {
+            "turn": sum(1 for msg in self.conversation_history if msg["role"] == "user"),
+            "messages_sent": message_count,
+            "prompt_tokens": usage.prompt_tokens if usage else 0,
+            "completion_tokens": (usage.completion_tokens or 0) if usage else 0,
+            "total_tokens": usage.total_tokens if usage else 0,
+            "cached": cached
+        }
+        if self.last_budget_report is not None:
+            entry["token_budget"] = self.last_budget_report["budget"]
+            entry["estimated_prompt_tokens"] = self.last_budget_report["estimated_tokens"]
+            entry["folded_turns"] = self.last_budget_report["folded_turns"]
+        self.token_usage.append(entry)
+
+    @staticmethod
+    def _parse_interests(content: str) -> List[str]:
+        """Splits the comma-separated model reply into a clean interest list."""
+        return [interest.strip() for interest in content.split(",") if interest.strip()]
+
+class AsyncCareerRecommender(CareerRecommender):
+    """
+    Asynchronous variant of CareerRecommender built on the async Mistral client.
+    Shares the prompt-selection state machine with the sync class; the LLM call is
+    awaited and blocking work (the cache's SQLite tier, explanation lookups) runs in
+    the loop's default executor, so one session's disk I/O does not stall the others.
+    """
+
+    async def _in_thread(self, fn, *args):
+        import asyncio # Only async callers pay for importing asyncio
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(fn, *args))
+
+    def _create_client(self):
+        if self.replay_from is not None:
+            from llm_recording import AsyncReplayClient
+            return AsyncReplayClient(self.replay_from, replay_latency=self.replay_latency)
+        # Created on first use inside the running event loop; shared by all sessions on that loop
+        from client_pool import get_shared_async_client
+        return self._recording(get_shared_async_client())
+
+    def _recording(self, client):
+        if self.record_to is None:
+            return client
+        from llm_recording import AsyncRecordingClient
+        return AsyncRecordingClient(client, self.record_to, session_id=self.session_id)
+
+    async def aprocess_response(self, user_response: str) -> Tuple[str, List[Dict]]:
+        """Async counterpart of process_response."""
+        with self.metrics.timer("process_response.total"):
+            self.conversation_history.append({"role": "user", "content": user_response})
+
+            interests = await self._aextract_interests()
+
+            recommendations = await self._in_thread(self._build_recommendations, interests)
+            with self.metrics.timer("prompt.select"):
+                next_prompt = self._select_next_prompt(recommendations)
+            self._finish_turn(next_prompt)
+        return next_prompt, recommendations
+
+    def process_response(self, user_response: str) -> Tuple[str, List[Dict]]:
+        raise TypeError("AsyncCareerRecommender is asynchronous; await aprocess_response() instead.")
+
+    def process_response_stream(self, user_response: str) -> Iterator[Tuple[str, Any]]:
+        raise TypeError("AsyncCareerRecommender does not stream; await aprocess_response() instead.")
+
+    async def _aextract_interests(self) -> List[str]:
+        interests = self._extract_interests_locally()
+        if interests is not None:
+            return interests
+
+        with self.metrics.timer("extract.build_messages"):
+            messages = self._build_extraction_messages()
+        try:
+            content = await self._acomplete(messages)
+        except Exception:
+            if self.resilience is None:
+                raise
+            return self._extract_interests_degraded()
+        return self._accept_interests(content)
+
+    async def _scheduled(self, complete, key: str):
+        """
+        Runs complete() on this loop from a scheduler worker, so the call is rate limited,
+        fairly queued and coalesced with identical requests from every session in the process.
+        """
+        import asyncio # Only async callers pay for importing asyncio
+        loop = asyncio.get_running_loop()
+        future = self.scheduler.submit_async(
+            lambda: asyncio.run_coroutine_threadsafe(complete(), loop).result(),
+            key=key,
+            session_id=self.session_id,
+            priority=self.priority
         )
-        
-        # Clean and split the response
-        interests = [interest.strip() for interest in response.choices[0].message.content.split(",")]
-        print(f"Extracted interests from Mistral: {interests}") # Debugging line
-        return interests
+        # Shielded: a cancelled turn must not cancel a call that coalesced sessions are waiting on
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    async def _acomplete(self, messages: List["ChatMessage"]) -> str:
+        cache_key, cached = await self._in_thread(self._lookup_cache, messages) if self.cache is not None else (None, None)
+        if cached is not None:
+            return cached
+
+        def call():
+            return self.client.chat(model=self.model, messages=messages, temperature=self.temperature)
+
+        async def complete():
+            if self.resilience is not None:
+                return await self.resilience.acall(call)
+            return await call()
+
+        with self.metrics.timer("extract.llm_call"):
+            if self.scheduler is not None:
+                response = await self._scheduled(complete, cache_key or make_cache_key(messages, self.model, self.temperature))
+            else:
+                response = await complete()
+        if cache_key is None:
+            return self._accept_response(messages, response, cache_key)
+        return await self._in_thread(self._accept_response, messages, response, cache_key)
 
 def format_recommendations(recommendations: List[Dict]) -> str:
     """Formats career recommendations into a professional, structured format."""
-    if not recommendations:
-        return "I need more information to provide career recommendations. Could you tell me more about your interests?"
-    
-    output = "Career Path Recommendations\n"
-    output += "=" * 30 + "\n\n"
-    
-    for rec in recommendations:
-        # Career Path Header
-        output += f"Career Path: {rec['path']}\n"
-        output += f"Match Confidence: {rec['confidence']:.0%}\n"
-        output += "-" * 30 + "\n"
-        
-        # Description
-        output += "Overview:\n"
-        output += f"{rec['description']}\n\n"
-        
-        # Career Options
-        output += "Recommended Career Options:\n"
-        for i, career in enumerate(rec['careers'][:3], 1):
-            output += f"{i}. {career}\n"
-        output += "\n" + "=" * 30 + "\n\n"
-    
-    return output 
+    return render_report(recommendations, "text")
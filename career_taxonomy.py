@@ -0,0 +1,182 @@
+import heapq
+import itertools
+import json
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Tuple
+
+from keyword_matcher import KeywordMatcher
+
+SECTOR, PATH, OCCUPATION = 0, 1, 2
+
+class OccupationMatch(NamedTuple):
+    sector: str
+    path: str
+    occupation: str
+    score: int # Keyword hits on the occupation, its path and its sector
+    confidence: float # score as a share of all keyword hits for the interests
+
+class CareerTaxonomy:
+    """
+    Three-level career catalog: sector -> path -> occupation.
+
+    Every node carries its own keywords; an occupation's score is the number of
+    keyword hits on itself, its path and its sector. Nodes are stored in flat,
+    catalog-ordered lists with contiguous child ranges, and a single keyword
+    matcher maps each keyword to the nodes that list it.
+
+    top_occupations() only touches nodes hit by some keyword. It then runs a
+    best-first search over subtree upper bounds, so untouched subtrees are never
+    expanded and the search stops as soon as k occupations have been found.
+    """
+
+    def __init__(self, sectors: List[Dict]):
+        self.sector_names: List[str] = []
+        self.sector_paths: List[Tuple[int, int]] = [] # Sector -> [start, end) path range
+        self.path_names: List[str] = []
+        self.path_sector: List[int] = []
+        self.path_occupations: List[Tuple[int, int]] = [] # Path -> [start, end) occupation range
+        self.occupation_names: List[str] = []
+        self.occupation_path: List[int] = []
+        keyword_nodes: Dict[str, List[Tuple[int, int]]] = {}
+
+        def index_keywords(keywords: Iterable[str], node: Tuple[int, int]) -> None:
+            for keyword in keywords:
+                nodes = keyword_nodes.setdefault(keyword.lower(), [])
+                if node not in nodes:
+                    nodes.append(node)
+
+        for sector in sectors:
+            sector_id = len(self.sector_names)
+            self.sector_names.append(sector["name"])
+            index_keywords(sector.get("keywords", []), (SECTOR, sector_id))
+            first_path = len(self.path_names)
+            for path in sector.get("paths", []):
+                path_id = len(self.path_names)
+                self.path_names.append(path["name"])
+                self.path_sector.append(sector_id)
+                index_keywords(path.get("keywords", []), (PATH, path_id))
+                first_occupation = len(self.occupation_names)
+                for occupation in path.get("occupations", []):
+                    occupation_id = len(self.occupation_names)
+                    self.occupation_names.append(occupation["name"])
+                    self.occupation_path.append(path_id)
+                    index_keywords(occupation.get("keywords", [occupation["name"]]), (OCCUPATION, occupation_id))
+                self.path_occupations.append((first_occupation, len(self.occupation_names)))
+            self.sector_paths.append((first_path, len(self.path_names)))
+
+        # The matcher's "paths" are (level, node id) pairs here
+        self.matcher = KeywordMatcher(keyword_nodes)
+
+    def __len__(self) -> int:
+        return len(self.occupation_names)
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "CareerTaxonomy":
+        """Builds a taxonomy from {"sectors": [{"name", "keywords", "paths": [{"name", "keywords", "occupations": [...]}]}]}."""
+        return cls(data["sectors"])
+
+    @classmethod
+    def from_json(cls, file: str) -> "CareerTaxonomy":
+        with open(file, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def from_career_paths(cls, career_paths: Dict[str, Dict]) -> "CareerTaxonomy":
+        """
+        Lifts a flat CAREER_PATHS-style mapping into a taxonomy: paths are grouped by
+        their optional "sector" field (each path is its own sector otherwise) and
+        every listed career becomes an occupation keyed by its name.
+        """
+        sectors: Dict[str, Dict] = {}
+        for path, data in career_paths.items():
+            sector = sectors.setdefault(data.get("sector", path), {"name": data.get("sector", path), "paths": []})
+            sector["paths"].append({
+                "name": path,
+                "keywords": data.get("keywords", []),
+                "occupations": [{"name": career} for career in data.get("careers", [])]
+            })
+        return cls(list(sectors.values()))
+
+    def _hits(self, interests: Iterable[str]) -> Tuple[Dict[int, int], Dict[int, int], Dict[int, int]]:
+        """Sparse keyword hit counts per sector, path and occupation (each keyword once per interest)."""
+        hits: Tuple[Dict[int, int], Dict[int, int], Dict[int, int]] = ({}, {}, {})
+        for interest in interests:
+            for keyword_id in self.matcher.match_ids(interest):
+                for level, node in self.matcher.keyword_paths[keyword_id]:
+                    level_hits = hits[level]
+                    level_hits[node] = level_hits.get(node, 0) + 1
+        return hits
+
+    def top_occupations(self, interests: Iterable[str], k: int = 3) -> List[OccupationMatch]:
+        """The k best-scoring occupations for the interests, best first; occupations with no hits are never returned."""
+        sector_hits, path_hits, occupation_hits = self._hits(interests)
+        total = sum(sector_hits.values()) + sum(path_hits.values()) + sum(occupation_hits.values())
+        if total == 0 or k <= 0:
+            return []
+
+        # Best own-or-descendant bound below each touched path and sector
+        best_occupation: Dict[int, int] = {}
+        for occupation, hits in occupation_hits.items():
+            path = self.occupation_path[occupation]
+            best_occupation[path] = max(best_occupation.get(path, 0), hits)
+        path_bound: Dict[int, int] = {}
+        for path in set(path_hits) | set(best_occupation):
+            path_bound[path] = path_hits.get(path, 0) + best_occupation.get(path, 0)
+        sector_best_path: Dict[int, int] = {}
+        for path, bound in path_bound.items():
+            sector = self.path_sector[path]
+            sector_best_path[sector] = max(sector_best_path.get(sector, 0), bound)
+
+        counter = itertools.count()
+        heap: List = [] # (-upper bound, first occupation id, sequence, kind, payload)
+
+        def push(bound: int, order: int, kind: str, payload) -> None:
+            if bound > 0:
+                heapq.heappush(heap, (-bound, order, next(counter), kind, payload))
+
+        for sector in set(sector_hits) | set(sector_best_path):
+            first_path = self.sector_paths[sector][0]
+            if first_path < self.sector_paths[sector][1]:
+                push(sector_hits.get(sector, 0) + sector_best_path.get(sector, 0),
+                     self.path_occupations[first_path][0], "sector", sector)
+
+        results: List[OccupationMatch] = []
+        while heap and len(results) < k:
+            negative_bound, order, _, kind, payload = heapq.heappop(heap)
+            if kind == "occupation":
+                occupation = payload
+                path = self.occupation_path[occupation]
+                results.append(OccupationMatch(
+                    self.sector_names[self.path_sector[path]], self.path_names[path],
+                    self.occupation_names[occupation], -negative_bound, -negative_bound / total
+                ))
+            elif kind == "sector":
+                sector = payload
+                base = sector_hits.get(sector, 0)
+                start, end = self.sector_paths[sector]
+                for path in range(start, end):
+                    if path in path_bound:
+                        push(base + path_bound[path], self.path_occupations[path][0], "path", path)
+                # Untouched paths all tie at the sector's own hits; expand them lazily, in catalog order
+                rest = (occupation for path in range(start, end) if path not in path_bound
+                        for occupation in range(*self.path_occupations[path]))
+                self._push_iterator(push, base, rest)
+            elif kind == "path":
+                path = payload
+                base = -negative_bound - best_occupation.get(path, 0)
+                start, end = self.path_occupations[path]
+                for occupation in range(start, end):
+                    if occupation in occupation_hits:
+                        push(base + occupation_hits[occupation], occupation, "occupation", occupation)
+                rest = (occupation for occupation in range(start, end) if occupation not in occupation_hits)
+                self._push_iterator(push, base, rest)
+            else: # "rest": a lazily expanded run of tied occupations
+                occupation, rest = payload
+                push(-negative_bound, occupation, "occupation", occupation)
+                self._push_iterator(push, -negative_bound, rest)
+        return results
+
+    @staticmethod
+    def _push_iterator(push, bound: int, occupations: Iterator[int]) -> None:
+        occupation = next(occupations, None)
+        if occupation is not None:
+            push(bound, occupation, "rest", (occupation, occupations))
@@ -0,0 +1,185 @@
+import asyncio
+import os
+import posixpath
+import threading
+import weakref
+from json import JSONDecodeError
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import orjson
+import requests
+from dotenv import load_dotenv
+from mistralai.async_client import MistralAsyncClient
+from mistralai.client import MistralClient
+from mistralai.constants import ENDPOINT, RETRY_STATUS_CODES
+from mistralai.exceptions import MistralAPIException, MistralConnectionException, MistralException
+from mistralai.models.chat_completion import ChatCompletionStreamResponse, ChatMessage
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import EmptyPoolError
+from urllib3.util.retry import Retry
+
+class _BoundedWaitPool:
+    """Connection pool mixin: waiting for a free connection gives up after pool_timeout seconds."""
+    pool_timeout: Optional[float] = None
+
+    def _get_conn(self, timeout: Optional[float] = None):
+        return super()._get_conn(timeout=self.pool_timeout if timeout is None else timeout)
+
+class _BoundedWaitAdapter(HTTPAdapter):
+    """HTTPAdapter whose blocking pools raise EmptyPoolError instead of waiting forever for a connection."""
+
+    def __init__(self, pool_timeout: float, **kwargs: Any):
+        self.pool_timeout = pool_timeout # Set before HTTPAdapter.__init__ builds the pool manager
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: type(pool_class.__name__, (_BoundedWaitPool, pool_class), {"pool_timeout": self.pool_timeout})
+            for scheme, pool_class in self.poolmanager.pool_classes_by_scheme.items()
+        }
+
+class PooledMistralClient(MistralClient):
+    """
+    MistralClient that keeps one requests.Session for its whole lifetime.
+
+    The stock client opens a new session, and with it a new TCP/TLS connection,
+    for every request. This one reuses keep-alive connections from a bounded pool
+    and caps the number of in-flight requests across all threads using it.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, endpoint: str = ENDPOINT, max_retries: int = 5,
+                 timeout: int = 120, pool_size: int = 16, max_concurrent_requests: int = 16,
+                 pool_timeout: float = 30.0):
+        super().__init__(api_key=api_key, endpoint=endpoint, max_retries=max_retries, timeout=timeout)
+        self._semaphore = threading.BoundedSemaphore(max_concurrent_requests)
+        self._session = requests.Session()
+        retries = Retry(
+            total=max_retries,
+            backoff_factor=0.5,
+            allowed_methods=["POST", "GET"],
+            status_forcelist=RETRY_STATUS_CODES,
+            raise_on_status=False,
+        )
+        # pool_block makes callers wait for a free connection instead of opening throwaway ones,
+        # but only for pool_timeout seconds so a leaked connection fails loudly rather than hanging
+        adapter = _BoundedWaitAdapter(pool_timeout, pool_connections=pool_size, pool_maxsize=pool_size,
+                                      pool_block=True, max_retries=retries)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._session.headers.update({
+            "Authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json",
+        })
+
+    def _request(
+        self,
+        method: str,
+        json: Dict[str, Any],
+        path: str,
+        stream: bool = False,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Union[requests.Response, Dict[str, Any]]:
+        if stream:
+            return self._send(method, json, path, stream=True, params=params) # The caller must close it
+
+        with self._semaphore:
+            response = self._send(method, json, path, stream=False, params=params)
+
+        try:
+            json_response: Dict[str, Any] = response.json()
+        except JSONDecodeError:
+            raise MistralAPIException.from_response(
+                response, message=f"Failed to decode json body: {response.text}"
+            )
+
+        self._check_response(json_response, dict(response.headers), response.status_code)
+        return json_response
+
+    def _send(self, method: str, json: Dict[str, Any], path: str, stream: bool,
+              params: Optional[Dict[str, Any]] = None) -> requests.Response:
+        url = posixpath.join(self._endpoint, path)
+        try:
+            return self._session.request(method, url, json=json, stream=stream, timeout=self._timeout, params=params)
+        except (requests.exceptions.ConnectionError, EmptyPoolError) as e:
+            raise MistralConnectionException(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            raise MistralException(f"Unexpected exception ({e.__class__.__name__}): {e}") from e
+
+    def chat_stream(self, model: str, messages: List[ChatMessage], temperature: Optional[float] = None,
+                    max_tokens: Optional[int] = None, top_p: Optional[float] = None,
+                    random_seed: Optional[int] = None, safe_mode: bool = True) -> Iterable[ChatCompletionStreamResponse]:
+        """
+        Same stream as MistralClient.chat_stream, but the response is closed when the
+        generator is, so a consumer that stops early hands its connection back to the pool.
+        """
+        request = self._make_chat_request(model, messages, temperature=temperature, max_tokens=max_tokens,
+                                          top_p=top_p, random_seed=random_seed, stream=True, safe_mode=safe_mode)
+        with self._semaphore:
+            response = self._send("post", request, "v1/chat/completions", stream=True)
+            try:
+                for line in response.iter_lines():
+                    if line.startswith(b"data: "):
+                        line = line[6:].strip()
+                        if line != b"[DONE]":
+                            yield ChatCompletionStreamResponse(**orjson.loads(line))
+            finally:
+                response.close()
+
+    def close(self) -> None:
+        self._session.close()
+
+_lock = threading.Lock()
+_shared_client: Optional[PooledMistralClient] = None
+# aiohttp sessions are bound to an event loop, so async clients are shared per loop
+_shared_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, MistralAsyncClient]" = weakref.WeakKeyDictionary()
+
+def _client_options() -> Dict[str, Any]:
+    load_dotenv() # Read .env when the first client is built rather than at import time
+    return {
+        "api_key": os.getenv("MISTRAL_API_KEY"),
+        "endpoint": os.getenv("MISTRAL_ENDPOINT", ENDPOINT),
+        "max_retries": int(os.getenv("MISTRAL_MAX_RETRIES", "5")),
+        "timeout": int(os.getenv("MISTRAL_TIMEOUT", "120")),
+        "max_concurrent_requests": int(os.getenv("MISTRAL_MAX_CONCURRENCY", "16")),
+    }
+
+def get_shared_client() -> PooledMistralClient:
+    """
+    Returns the process-wide pooled client, creating it on first use.
+    Configured by MISTRAL_API_KEY, MISTRAL_ENDPOINT, MISTRAL_MAX_RETRIES,
+    MISTRAL_TIMEOUT, MISTRAL_MAX_CONCURRENCY, MISTRAL_POOL_SIZE and
+    MISTRAL_POOL_TIMEOUT.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _lock:
+            if _shared_client is None:
+                options = _client_options()
+                options["pool_size"] = int(os.getenv("MISTRAL_POOL_SIZE", str(options["max_concurrent_requests"])))
+                options["pool_timeout"] = float(os.getenv("MISTRAL_POOL_TIMEOUT", "30"))
+                _shared_client = PooledMistralClient(**options)
+    return _shared_client
+
+def get_shared_async_client() -> MistralAsyncClient:
+    """Returns the async client shared by every session on the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _shared_async_clients.get(loop)
+    if client is None:
+        client = MistralAsyncClient(**_client_options())
+        _shared_async_clients[loop] = client
+    return client
+
+def reset_shared_clients() -> None:
+    """Closes the shared sync client so the next call builds a fresh one (e.g. after changing settings)."""
+    global _shared_client
+    with _lock:
+        if _shared_client is not None:
+            _shared_client.close()
+        _shared_client = None
+
+async def close_shared_async_client() -> None:
+    """Closes the async client of the running loop; call before the loop shuts down."""
+    client = _shared_async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.close()
@@ -0,0 +1,179 @@
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from career_paths import get_catalog
+from metrics import Metrics, get_metrics
+from prompt_templates import get_career_path_explanation_prompt
+
+logger = logging.getLogger(__name__)
+
+class ExplanationService:
+    """
+    LLM-written explanations of career paths, generated once per catalog revision.
+
+    Explanations are keyed by (path, catalog version), kept in memory and, when
+    disk_path is given, in a SQLite file so they survive restarts and can be
+    precomputed by the warm-up CLI. prefetch() generates missing explanations on a
+    background thread pool, so request handlers only ever read what is ready. A
+    failed generation is not retried for `failure_ttl` seconds, and with
+    generate=False the service only serves what is already stored.
+    """
+
+    def __init__(self, client=None, disk_path: Optional[str] = None, model: str = "mistral-medium",
+                 temperature: float = 0.7, workers: int = 4, failure_ttl: float = 300.0, generate: bool = True,
+                 metrics: Optional[Metrics] = None):
+        self._client = client # Created lazily so building the service never touches the network
+        self.model = model
+        self.temperature = temperature
+        self.failure_ttl = failure_ttl
+        self.generate = generate
+        self.metrics = metrics or get_metrics()
+        self._memory: Dict[Tuple[str, str], str] = {}
+        self._pending: Dict[Tuple[str, str], Future] = {}
+        self._failed: Dict[Tuple[str, str], Tuple[float, BaseException]] = {} # key -> (retry after, error)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="explanations")
+        self._db = None
+        if disk_path:
+            directory = os.path.dirname(os.path.abspath(disk_path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS career_explanations ("
+                "path TEXT NOT NULL, catalog_version TEXT NOT NULL, explanation TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (path, catalog_version))"
+            )
+            self._db.commit()
+
+    @property
+    def client(self):
+        if self._client is None:
+            from client_pool import get_shared_client
+            self._client = get_shared_client()
+        return self._client
+
+    def cached(self, path: str, version: Optional[str] = None) -> Optional[str]:
+        """Returns the stored explanation for a path, or None if it has not been generated yet."""
+        key = (path, version or get_catalog().version)
+        with self._lock:
+            explanation = self._memory.get(key)
+            if explanation is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT explanation FROM career_explanations WHERE path = ? AND catalog_version = ?", key
+                ).fetchone()
+                if row is not None:
+                    explanation = self._memory[key] = row[0]
+        self.metrics.incr("explanations.hits" if explanation is not None else "explanations.misses")
+        return explanation
+
+    def settled(self, path: str, version: Optional[str] = None) -> bool:
+        """True when no generation is in flight for the path: it is stored, failed recently or will not be generated."""
+        with self._lock:
+            return (path, version or get_catalog().version) not in self._pending
+
+    def get(self, path: str) -> str:
+        """Returns the explanation for a path, generating it now if needed (blocks on the LLM)."""
+        return self.cached(path) or self.prefetch([path])[0].result()
+
+    def prefetch(self, paths: Iterable[str]) -> List[Future]:
+        """Schedules generation of missing explanations; returns one Future per path."""
+        version = get_catalog().version
+        now = time.monotonic()
+        futures = []
+        for path in paths:
+            key = (path, version)
+            error = None
+            with self._lock:
+                explanation = self._memory.get(key)
+                future = self._pending.get(key)
+                if explanation is None and future is None and self.generate:
+                    retry_after, error = self._failed.get(key, (0.0, None))
+                    if retry_after <= now:
+                        error = None
+                        future = self._executor.submit(self._generate, path, version)
+                        self._pending[key] = future
+            if future is None:
+                future = Future()
+                if error is not None:
+                    future.set_exception(error) # Failed recently: no new call until failure_ttl has passed
+                else:
+                    future.set_result(explanation)
+            futures.append(future)
+        return futures
+
+    def warm(self, paths: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Generates explanations for every catalog path (or the given ones) in parallel and waits for them."""
+        paths = list(paths) if paths is not None else list(get_catalog().paths)
+        missing = [path for path in paths if self.cached(path) is None]
+        failed = 0
+        for future in as_completed(self.prefetch(missing)):
+            if future.exception() is not None:
+                failed += 1
+        return {"paths": len(paths), "generated": len(missing) - failed, "failed": failed}
+
+    def _generate(self, path: str, version: str) -> str:
+        key = (path, version)
+        try:
+            if self._db is not None:
+                cached = self.cached(path, version) # Another process may have written it meanwhile
+                if cached is not None:
+                    return cached
+            from mistralai.models.chat_completion import ChatMessage # Deferred like the client itself
+            with self.metrics.timer("explanations.generate"):
+                response = self.client.chat(
+                    model=self.model,
+                    messages=[ChatMessage(role="user", content=get_career_path_explanation_prompt(path))],
+                    temperature=self.temperature
+                )
+            explanation = response.choices[0].message.content.strip()
+            with self._lock:
+                self._memory[key] = explanation
+                self._failed.pop(key, None)
+                if self._db is not None:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO career_explanations (path, catalog_version, explanation, created_at) VALUES (?, ?, ?, ?)",
+                        (path, version, explanation, time.time())
+                    )
+                    self._db.commit()
+            self.metrics.incr("explanations.generated")
+            return explanation
+        except Exception as e:
+            logger.warning("Could not generate an explanation for %s", path, exc_info=True)
+            with self._lock:
+                self._failed[key] = (time.monotonic() + self.failure_ttl, e)
+            self.metrics.incr("explanations.failed")
+            raise
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+                self._db = None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute LLM explanations for every career path in the catalog.")
+    parser.add_argument("db", help="SQLite file to store explanations in")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel generation requests")
+    parser.add_argument("--paths", nargs="+", help="Only these paths (default: the whole catalog)")
+    args = parser.parse_args()
+
+    service = ExplanationService(disk_path=args.db, workers=args.workers)
+    started = time.perf_counter()
+    result = service.warm(args.paths)
+    service.close()
+    print(f"{result['generated']} generated, {result['failed']} failed, "
+          f"{result['paths'] - result['generated'] - result['failed']} already cached "
+          f"({time.perf_counter() - started:.1f}s, catalog version {get_catalog().version})")
+
+if __name__ == "__main__":
+    main()
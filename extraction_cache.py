@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_content(content: str) -> str:
+    """Normalizes message text so trivially different openers share a cache entry."""
+    return _WHITESPACE.sub(" ", content).strip().lower()
+
+def make_cache_key(messages: Iterable, model: str, temperature: Optional[float]) -> str:
+    """Builds a stable key from the normalized message sequence, model and temperature."""
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "messages": [[msg.role, normalize_content(msg.content)] for msg in messages]
+    }
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+class ExtractionCache:
+    """
+    Cache for LLM interest extraction replies.
+
+    Entries live in an in-memory LRU bounded by max_entries and expire after
+    ttl_seconds. When disk_path is given, entries are also written to a SQLite
+    file so they survive restarts; expired rows are ignored and pruned lazily.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 24 * 3600, disk_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict() # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._db = None
+        if disk_path:
+            directory = os.path.dirname(os.path.abspath(disk_path))
+            os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS extraction_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached reply for a key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM extraction_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if row[1] > now:
+                        self._store_in_memory(key, row[0], row[1])
+                        self.hits += 1
+                        return row[0]
+                    self._db.execute("DELETE FROM extraction_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: str) -> None:
+        """Stores a reply in memory and, if configured, on disk."""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._store_in_memory(key, value, expires_at)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO extraction_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+                self._db.commit()
+
+    def _store_in_memory(self, key: str, value: str, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False) # Evict least recently used
+
+    def clear(self) -> None:
+        """Drops every entry, including the on-disk store."""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM extraction_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, float]:
+        """Returns hit/miss counters and the current in-memory size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries)
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
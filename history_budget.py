@@ -0,0 +1,117 @@
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+MESSAGE_OVERHEAD_TOKENS = 4 # Role markers and separators the chat format adds around every message
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate: about four characters per token, never less than one per word."""
+    if not text:
+        return 0
+    return max(math.ceil(len(text) / 4), len(text.split()))
+
+def estimate_message_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(msg["content"]) + MESSAGE_OVERHEAD_TOKENS for msg in messages)
+
+def split_turns(history: List[Dict[str, str]]) -> List[List[Dict[str, str]]]:
+    """Groups history into turns, each starting at a user message."""
+    turns: List[List[Dict[str, str]]] = []
+    for msg in history:
+        if msg["role"] == "user" or not turns:
+            turns.append([])
+        turns[-1].append(msg)
+    return turns
+
+def condense(text: str, max_chars: int = 160) -> str:
+    """First sentence of text, cut at a word boundary to at most max_chars."""
+    text = " ".join(text.split())
+    text = _SENTENCE_END.split(text, maxsplit=1)[0]
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + "..."
+
+class HistoryBudget:
+    """
+    Fits the extraction request into a token budget.
+
+    The last `keep_turns` turns are sent verbatim. Older turns are folded into a
+    summary appended to the system prompt: the interest ledger (interests already
+    extracted) followed by condensed excerpts of the older user messages, newest
+    first, for as long as they fit. If the verbatim window alone is over budget it
+    shrinks, down to the newest user message, which is truncated as a last resort.
+    """
+
+    def __init__(self, max_tokens: int = 2000, keep_turns: int = 3, excerpt_chars: int = 160):
+        self.max_tokens = max_tokens
+        self.keep_turns = max(1, keep_turns)
+        self.excerpt_chars = excerpt_chars
+
+    def fit(self, system_prompt: str, history: List[Dict[str, str]],
+            ledger: Optional[List[str]] = None) -> Tuple[List[Dict[str, str]], Dict]:
+        """Returns (messages, report); messages start with the system prompt and end with the newest turn."""
+        turns = split_turns(history)
+        system_tokens = estimate_tokens(system_prompt) + MESSAGE_OVERHEAD_TOKENS
+
+        keep = min(self.keep_turns, len(turns))
+        while keep > 1 and system_tokens + estimate_message_tokens(self._flatten(turns[-keep:])) > self.max_tokens:
+            keep -= 1
+        verbatim = self._flatten(turns[-keep:]) if keep else []
+        if keep == 1 and system_tokens + estimate_message_tokens(verbatim) > self.max_tokens:
+            verbatim = [self._truncate(verbatim[0], self.max_tokens - system_tokens)]
+
+        older = turns[:len(turns) - keep]
+        remaining = self.max_tokens - system_tokens - estimate_message_tokens(verbatim)
+        summary = self._summarize(older, ledger or [], remaining)
+        system_content = f"{system_prompt}\n\n{summary}" if summary else system_prompt
+
+        messages = [{"role": "system", "content": system_content}] + verbatim
+        estimated = estimate_message_tokens(messages)
+        report = {
+            "budget": self.max_tokens,
+            "estimated_tokens": estimated,
+            "verbatim_turns": keep,
+            "folded_turns": len(older),
+            "over_budget": estimated > self.max_tokens
+        }
+        return messages, report
+
+    @staticmethod
+    def _flatten(turns: List[List[Dict[str, str]]]) -> List[Dict[str, str]]:
+        return [msg for turn in turns for msg in turn]
+
+    @staticmethod
+    def _truncate(message: Dict[str, str], tokens: int) -> Dict[str, str]:
+        """Keeps the start of an oversized message within roughly `tokens` tokens."""
+        limit = max(0, tokens - MESSAGE_OVERHEAD_TOKENS)
+        content = message["content"][:limit * 4]
+        while content and estimate_tokens(content) > limit:
+            content = content[:len(content) * limit // estimate_tokens(content)] # Shrink proportionally for word-dense text
+        return {"role": message["role"], "content": content}
+
+    def _summarize(self, older: List[List[Dict[str, str]]], ledger: List[str], available: int) -> str:
+        if not older:
+            return ""
+        lines = ["Summary of earlier conversation:"]
+        used = estimate_tokens(lines[0])
+        if ledger:
+            ledger_line = "Interests identified so far: " + ", ".join(ledger)
+            cost = estimate_tokens(ledger_line)
+            if used + cost <= available:
+                lines.append(ledger_line)
+                used += cost
+
+        excerpts = []
+        for turn in reversed(older):
+            user_text = next((msg["content"] for msg in turn if msg["role"] == "user"), "")
+            if not user_text:
+                continue
+            excerpt = f"- User said: {condense(user_text, self.excerpt_chars)}"
+            cost = estimate_tokens(excerpt)
+            if used + cost > available:
+                break
+            excerpts.append(excerpt)
+            used += cost
+        lines.extend(reversed(excerpts)) # Back to chronological order
+
+        return "\n".join(lines) if len(lines) > 1 else ""
@@ -0,0 +1,73 @@
+from typing import Dict, List, Optional
+
+from career_paths import get_catalog
+from keyword_matcher import KeywordMatcher, fold_plural
+
+def lemmatize(token: str) -> str:
+    """
+    Light rule-based lemmatizer so inflected forms share a stem with catalog keywords,
+    e.g. "programming"/"program", "engineer"/"engineering", "nurse"/"nursing".
+    """
+    token = fold_plural(token) # therapies -> therapy, arts -> art
+    if len(token) <= 3:
+        return token
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            stem = token[:-len(suffix)]
+            if len(stem) > 3 and stem[-1] == stem[-2] and stem[-1] not in "ls":
+                stem = stem[:-1] # programming -> program
+            return stem
+    if token.endswith("e") and len(token) > 4:
+        return token[:-1] # nurse -> nurs, matching nursing
+    return token
+
+class InterestExtractor:
+    """
+    Interface for pluggable interest extractors used by CareerRecommender.
+
+    extract() receives the conversation history and returns a list of interests,
+    or None to defer the turn to the LLM extractor.
+    """
+
+    def extract(self, conversation_history: List[Dict]) -> Optional[List[str]]:
+        raise NotImplementedError
+
+def lemmatized_matcher(catalog) -> KeywordMatcher:
+    return KeywordMatcher.from_path_keywords(catalog.path_keywords, normalize=lemmatize)
+
+class KeywordInterestExtractor(InterestExtractor):
+    """
+    Local, deterministic extractor that phrase-matches user turns against the
+    keyword vocabulary of the career catalog. Runs in milliseconds with no network.
+
+    With min_matches=0 it always answers (fully offline mode). With a higher value
+    it only answers when the newest user turn is keyword-rich enough, otherwise it
+    returns None so the LLM handles ambiguous input.
+    """
+
+    def __init__(self, career_paths: Optional[Dict[str, Dict]] = None, min_matches: int = 0):
+        # Without explicit paths the matcher follows the active catalog, see the matcher property
+        self._matcher = None if career_paths is None else KeywordMatcher.from_career_paths(career_paths, normalize=lemmatize)
+        self.min_matches = min_matches
+
+    @property
+    def matcher(self) -> KeywordMatcher:
+        if self._matcher is not None:
+            return self._matcher
+        # Looked up on every call so a catalog reload takes effect; shared by every extractor until then
+        return get_catalog().derived("lemmatized_matcher", lemmatized_matcher)
+
+    def extract(self, conversation_history: List[Dict]) -> Optional[List[str]]:
+        matcher = self.matcher
+        user_turns = [msg["content"] for msg in conversation_history if msg["role"] == "user"]
+        if self.min_matches and (not user_turns or len(matcher.match_ids(user_turns[-1])) < self.min_matches):
+            return None
+
+        interests: List[str] = []
+        seen = set()
+        for turn in user_turns:
+            for keyword in matcher.match(turn):
+                if keyword not in seen:
+                    seen.add(keyword)
+                    interests.append(keyword)
+        return interests
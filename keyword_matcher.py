@@ -0,0 +1,134 @@
+import re
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Splits text into lowercase alphanumeric tokens; punctuation and hyphens act as word boundaries
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Endings that turn a keyword into a related word: "designer", "artist", "musician", "mathematics".
+# They are matched after plurals are folded, so only singular forms are listed.
+DERIVATIONAL_ENDINGS = frozenset(["er", "or", "ist", "ian", "ic", "ical", "al", "ally", "ematic"])
+
+def fold_plural(token: str) -> str:
+    """Folds simple plurals so that "arts" matches "art" and "technologies" matches "technology"."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+def tokenize(text: str, normalize: Callable[[str], str] = fold_plural) -> List[str]:
+    """Returns the normalized word tokens of a piece of text."""
+    return [normalize(token) for token in TOKEN_PATTERN.findall(text.lower())]
+
+class KeywordMatcher:
+    """
+    Multi-pattern keyword matcher compiled once from a career catalog.
+
+    Keywords are stored in a token-level trie, so each interest is scanned in a
+    single left-to-right pass whose cost depends on the interest length and the
+    longest keyword phrase, not on the number of paths or keywords. Matching
+    respects word boundaries: "art" no longer matches "start". A word that is a
+    keyword plus a derivational ending ("designer", "musician") or two keywords
+    run together ("healthcare") is read as those keywords; an ending starting
+    with "e" does not attach to a keyword ending in "e", so "career" is not "care".
+    """
+
+    def __init__(self, keyword_paths: Dict[str, List[str]], normalize: Callable[[str], str] = fold_plural):
+        self.normalize = normalize
+        self._trie: Dict = {}
+        self._terminal = object() # Sentinel key holding the keyword id at the end of a phrase
+        self.keywords: List[str] = [] # Keyword id -> keyword text
+        self.keyword_paths: List[Tuple[str, ...]] = [] # Keyword id -> paths containing the keyword
+        self.max_phrase_length = 0
+        self.vocabulary: Set[str] = set() # Every normalized keyword token
+
+        for keyword, paths in keyword_paths.items():
+            tokens = tokenize(keyword, normalize)
+            if not tokens:
+                continue
+            self.vocabulary.update(tokens)
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            keyword_id = node.get(self._terminal)
+            if keyword_id is None:
+                # Different spellings may normalize to the same phrase; they share one id
+                keyword_id = len(self.keywords)
+                node[self._terminal] = keyword_id
+                self.keywords.append(keyword)
+                self.keyword_paths.append(tuple(paths))
+            else:
+                merged = self.keyword_paths[keyword_id] + tuple(p for p in paths if p not in self.keyword_paths[keyword_id])
+                self.keyword_paths[keyword_id] = merged
+            self.max_phrase_length = max(self.max_phrase_length, len(tokens))
+
+    @classmethod
+    def from_career_paths(cls, career_paths: Dict[str, Dict], normalize: Callable[[str], str] = fold_plural) -> "KeywordMatcher":
+        """Compiles a matcher from a CAREER_PATHS-style mapping."""
+        return cls.from_path_keywords(
+            {path: data.get("keywords", []) for path, data in career_paths.items()}, normalize
+        )
+
+    @classmethod
+    def from_path_keywords(cls, path_keywords: Dict[str, List[str]], normalize: Callable[[str], str] = fold_plural) -> "KeywordMatcher":
+        """Compiles a matcher from a {path: [keywords]} mapping."""
+        keyword_paths: Dict[str, List[str]] = {}
+        for path, keywords in path_keywords.items():
+            for keyword in keywords:
+                paths = keyword_paths.setdefault(keyword.lower(), [])
+                if path not in paths:
+                    paths.append(path)
+        return cls(keyword_paths, normalize)
+
+    def _split(self, token: str) -> List[str]:
+        """Reads a token as the keyword tokens it is derived from or compounded of, if any."""
+        if token in self.vocabulary:
+            return [token]
+        vocabulary = self.vocabulary
+        for end in range(3, len(token) - 1):
+            head = token[:end]
+            if head not in vocabulary:
+                continue
+            rest = token[end:]
+            if rest in vocabulary:
+                return [head, rest]
+            if rest in DERIVATIONAL_ENDINGS and not (head[-1] == "e" and rest[0] == "e"):
+                return [head]
+        return [token]
+
+    def tokens(self, text: str) -> List[str]:
+        """Normalized tokens of the text, with derived and compound words split into keyword tokens."""
+        return [part for token in tokenize(text, self.normalize) for part in self._split(token)]
+
+    def match_ids(self, text: str) -> Set[int]:
+        """Returns the ids of all keywords occurring in the text."""
+        tokens = self.tokens(text)
+        matched: Set[int] = set()
+        trie = self._trie
+        terminal = self._terminal
+        for start in range(len(tokens)):
+            node = trie
+            for token in tokens[start:start + self.max_phrase_length]:
+                node = node.get(token)
+                if node is None:
+                    break
+                keyword_id = node.get(terminal)
+                if keyword_id is not None:
+                    matched.add(keyword_id)
+        return matched
+
+    def match(self, text: str) -> List[str]:
+        """Returns the keywords occurring in the text, in catalog order."""
+        return [self.keywords[keyword_id] for keyword_id in sorted(self.match_ids(text))]
+
+    def path_hits(self, interests: Iterable[str], hits: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+        """
+        Counts keyword hits per path over a list of interests.
+        Each keyword counts at most once per interest, as in the original substring scan.
+        """
+        hits = {} if hits is None else hits
+        for interest in interests:
+            for keyword_id in self.match_ids(interest):
+                for path in self.keyword_paths[keyword_id]:
+                    hits[path] = hits.get(path, 0) + 1
+        return hits
@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from extraction_cache import make_cache_key
+
+class ReplayMissError(LookupError):
+    """A replayed request has no recorded response."""
+
+class RecordedError(RuntimeError):
+    """Replays a call that failed when it was recorded."""
+
+class FixtureWriter:
+    """Appends records to a JSONL fixture; one per path, shared by every recording client in the process."""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict) -> None:
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush() # A crashed run still leaves every finished call in the fixture
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+_writers: Dict[str, FixtureWriter] = {}
+_writers_lock = threading.Lock()
+
+def get_fixture_writer(path: str) -> FixtureWriter:
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = FixtureWriter(path)
+        return writer
+
+def load_fixture(path: str) -> List[Dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+class Fixture:
+    """Parsed fixture records, in file order and indexed by request key."""
+
+    def __init__(self, records: List[Dict]):
+        self.records = records
+        self.by_key: Dict[str, List[Dict]] = {}
+        for record in records:
+            self.by_key.setdefault(record["key"], []).append(record)
+
+_fixtures: Dict[str, Tuple[Tuple[float, int], Fixture]] = {}
+_fixtures_lock = threading.Lock()
+
+def get_fixture(path: str) -> Fixture:
+    """Loads a fixture once per process and shares it between replay clients until the file changes."""
+    key = os.path.abspath(path)
+    stat = os.stat(key)
+    signature = (stat.st_mtime, stat.st_size)
+    with _fixtures_lock:
+        entry = _fixtures.get(key)
+        if entry is None or entry[0] != signature:
+            entry = _fixtures[key] = (signature, Fixture(load_fixture(key)))
+        return entry[1]
+
+def _usage_dict(usage) -> Optional[Dict[str, int]]:
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens
+    }
+
+class RecordingClient:
+    """
+    Wraps a Mistral client and writes every chat request and response pair to a
+    JSONL fixture: the request key (as used by the extraction cache), messages,
+    reply, token usage and wall time, plus per-chunk offsets for streamed calls.
+    Failed calls are recorded too, so replays reproduce them.
+    """
+
+    def __init__(self, client, path: str, session_id: Optional[str] = None):
+        self.client = client
+        self.writer = get_fixture_writer(path)
+        self.session_id = session_id # Groups the records of one conversation
+        self._seq = 0
+
+    def _record(self, model: str, messages: List, temperature: Optional[float], started: float, reply: Optional[str],
+                usage=None, chunks: Optional[List] = None, error: Optional[BaseException] = None,
+                closed_early: bool = False) -> None:
+        record = {
+            "session": self.session_id,
+            "seq": self._seq,
+            "key": make_cache_key(messages, model, temperature),
+            "model": model,
+            "temperature": temperature,
+            "messages": [[msg.role, msg.content] for msg in messages],
+            "reply": reply,
+            "usage": _usage_dict(usage),
+            "latency_s": round(time.perf_counter() - started, 6)
+        }
+        if chunks is not None:
+            record["chunks"] = chunks # [offset_s, text] per streamed delta
+        if error is not None:
+            record["error"] = f"{type(error).__name__}: {error}"
+        if closed_early:
+            record["closed_early"] = True # The consumer stopped reading; reply holds what had arrived
+        self._seq += 1
+        self.writer.write(record)
+
+    def chat(self, model: str, messages: List, temperature: Optional[float] = None, **kwargs: Any):
+        started = time.perf_counter()
+        try:
+            response = self.client.chat(model=model, messages=messages, temperature=temperature, **kwargs)
+        except Exception as e:
+            self._record(model, messages, temperature, started, None, error=e)
+            raise
+        self._record(model, messages, temperature, started, response.choices[0].message.content, response.usage)
+        return response
+
+    def chat_stream(self, model: str, messages: List, temperature: Optional[float] = None, **kwargs: Any) -> Iterator:
+        started = time.perf_counter()
+        chunks: List = []
+        usage = None
+        error: Optional[BaseException] = None
+        closed_early = False
+        try:
+            for chunk in self.client.chat_stream(model=model, messages=messages, temperature=temperature, **kwargs):
+                usage = chunk.usage or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    chunks.append([round(time.perf_counter() - started, 6), delta])
+                yield chunk
+        except GeneratorExit:
+            closed_early = True
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Also reached when the consumer closes the stream early, so partial streams are recorded too
+            reply = None if error is not None else "".join(text for _, text in chunks)
+            self._record(model, messages, temperature, started, reply, usage, chunks, error, closed_early)
+
+class AsyncRecordingClient(RecordingClient):
+    """RecordingClient for the async Mistral client."""
+
+    async def chat(self, model: str, messages: List, temperature: Optional[float] = None, **kwargs: Any):
+        started = time.perf_counter()
+        try:
+            response = await self.client.chat(model=model, messages=messages, temperature=temperature, **kwargs)
+        except Exception as e:
+            self._record(model, messages, temperature, started, None, error=e)
+            raise
+        self._record(model, messages, temperature, started, response.choices[0].message.content, response.usage)
+        return response
+
+class ReplayClient:
+    """
+    Serves chat responses from a fixture written by RecordingClient, without network
+    access. With match="request" a request is answered by the recorded response to
+    the same (normalized) messages, model and temperature; repeats are served in
+    recorded order and the last one is reused once they run out. match="sequence"
+    ignores the request and serves records in file order, for replaying a trace
+    after prompts have changed. With replay_latency the original call durations and
+    chunk timings are reproduced, divided by `speed`.
+    """
+
+    def __init__(self, path: str, match: str = "request", replay_latency: bool = False, speed: float = 1.0,
+                 session_id: Optional[str] = None):
+        if match not in ("request", "sequence"):
+            raise ValueError("match must be 'request' or 'sequence'")
+        fixture = get_fixture(path)
+        if session_id is not None:
+            fixture = Fixture([record for record in fixture.records if record.get("session") == session_id])
+        self.match = match
+        self.replay_latency = replay_latency
+        self.speed = speed
+        self.served = 0
+        self.misses = 0
+        self._sequence = fixture.records
+        self._by_key = fixture.by_key
+        self._served_per_key: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _next_record(self, model: str, messages: List, temperature: Optional[float]) -> Dict:
+        with self._lock:
+            if self.match == "sequence":
+                if self.served >= len(self._sequence):
+                    self.misses += 1
+                    raise ReplayMissError(f"Fixture exhausted after {self.served} calls")
+                record = self._sequence[self.served]
+            else:
+                key = make_cache_key(messages, model, temperature)
+                candidates = self._by_key.get(key)
+                if not candidates:
+                    self.misses += 1
+                    raise ReplayMissError(f"No recorded response for request {key[:12]}")
+                index = self._served_per_key.get(key, 0)
+                self._served_per_key[key] = index + 1
+                record = candidates[min(index, len(candidates) - 1)]
+            self.served += 1
+        return record
+
+    def _delay(self, seconds: float) -> float:
+        return seconds / self.speed if self.replay_latency else 0.0
+
+    @staticmethod
+    def _usage(record: Dict):
+        return SimpleNamespace(**record["usage"]) if record.get("usage") else None
+
+    @classmethod
+    def _response(cls, record: Dict):
+        if record.get("error"):
+            raise RecordedError(record["error"])
+        message = SimpleNamespace(role="assistant", content=record["reply"])
+        return SimpleNamespace(choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+                               usage=cls._usage(record), model=record["model"])
+
+    def chat(self, model: str, messages: List, temperature: Optional[float] = None, **kwargs: Any):
+        record = self._next_record(model, messages, temperature)
+        delay = self._delay(record["latency_s"])
+        if delay:
+            time.sleep(delay)
+        return self._response(record)
+
+    def chat_stream(self, model: str, messages: List, temperature: Optional[float] = None, **kwargs: Any) -> Iterator:
+        record = self._next_record(model, messages, temperature)
+        # Calls recorded without streaming replay as a single chunk at the end of the call
+        chunks = record.get("chunks") or ([[record["latency_s"], record["reply"]]] if record.get("reply") else [])
+        elapsed = 0.0
+        for offset, text in chunks:
+            delay = self._delay(offset - elapsed)
+            if delay > 0:
+                time.sleep(delay)
+            elapsed = offset
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content=text))], usage=None)
+        if record.get("error"):
+            raise RecordedError(record["error"])
+        yield SimpleNamespace(choices=[], usage=self._usage(record))
+
+    def close(self) -> None:
+        pass
+
+class AsyncReplayClient(ReplayClient):
+    """ReplayClient for code written against the async Mistral client."""
+
+    async def chat(self, model: str, messages: List, temperature: Optional[float] = None, **kwargs: Any):
+        import asyncio # Only async callers pay for importing asyncio
+        record = self._next_record(model, messages, temperature)
+        delay = self._delay(record["latency_s"])
+        if delay:
+            await asyncio.sleep(delay)
+        return self._response(record)
+
+    async def close(self) -> None:
+        pass
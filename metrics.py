@@ -0,0 +1,179 @@
+import logging
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+def percentiles(samples: Sequence[float], points: Sequence[int] = (50, 90, 95, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of a list of samples."""
+    if not samples:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(samples)
+    result = {}
+    for p in points:
+        # Smallest value with at least p% of samples at or below it; p * n / 100 keeps integer inputs exact
+        rank = max(0, math.ceil(p * len(ordered) / 100) - 1)
+        result[f"p{p}"] = ordered[rank]
+    return result
+
+class MetricsSink:
+    """Receives timings, counters and gauges. Subclasses override what they need."""
+
+    def observe(self, name: str, value: float) -> None:
+        pass
+
+    def incr(self, name: str, value: float) -> None:
+        pass
+
+    def gauge(self, name: str, value: float) -> None:
+        pass
+
+class LoggingSink(MetricsSink):
+    """Writes every measurement to a logger; handy during development."""
+
+    def __init__(self, log: Optional[logging.Logger] = None, level: int = logging.INFO):
+        self.log = log or logger
+        self.level = level
+
+    def observe(self, name: str, value: float) -> None:
+        self.log.log(self.level, "%s took %.2f ms", name, value * 1000)
+
+    def incr(self, name: str, value: float) -> None:
+        self.log.log(self.level, "%s += %s", name, value)
+
+    def gauge(self, name: str, value: float) -> None:
+        self.log.log(self.level, "%s = %s", name, value)
+
+class InMemorySink(MetricsSink):
+    """
+    Keeps counters, gauges and a bounded window of recent samples per timer,
+    from which percentiles are computed on demand.
+    """
+
+    def __init__(self, max_samples: int = 10000):
+        self.max_samples = max_samples
+        self.samples: Dict[str, List[float]] = {}
+        self.totals: Dict[str, float] = {} # Sum of every observation per timer
+        self.observations: Dict[str, int] = {} # Number of observations per timer
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float) -> None:
+        with self._lock:
+            window = self.samples.setdefault(name, [])
+            window.append(value)
+            if len(window) > self.max_samples:
+                del window[:len(window) - self.max_samples]
+            self.totals[name] = self.totals.get(name, 0.0) + value
+            self.observations[name] = self.observations.get(name, 0) + 1
+
+    def incr(self, name: str, value: float) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        with self._lock:
+            self.gauges[name] = value
+
+    def summary(self) -> Dict[str, Dict]:
+        """Returns count, mean and percentiles (in seconds) for every timer, plus counters and gauges."""
+        with self._lock:
+            timers = {
+                name: {
+                    "count": self.observations[name],
+                    "mean": self.totals[name] / self.observations[name],
+                    **percentiles(window)
+                }
+                for name, window in self.samples.items()
+            }
+            return {"timers": timers, "counters": dict(self.counters), "gauges": dict(self.gauges)}
+
+class PrometheusTextSink(InMemorySink):
+    """In-memory sink that renders its data in the Prometheus text exposition format."""
+
+    def __init__(self, prefix: str = "career_recommender", max_samples: int = 10000):
+        super().__init__(max_samples)
+        self.prefix = prefix
+
+    def _metric_name(self, name: str) -> str:
+        return re.sub(r"[^a-zA-Z0-9_]", "_", f"{self.prefix}_{name}")
+
+    def render(self) -> str:
+        summary = self.summary()
+        lines = []
+        for name, stats in sorted(summary["timers"].items()):
+            metric = self._metric_name(name) + "_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for quantile in ("p50", "p90", "p99"):
+                lines.append(f'{metric}{{quantile="{int(quantile[1:]) / 100}"}} {stats[quantile]:.6f}')
+            lines.append(f"{metric}_sum {stats['mean'] * stats['count']:.6f}")
+            lines.append(f"{metric}_count {stats['count']}")
+        for name, value in sorted(summary["counters"].items()):
+            metric = self._metric_name(name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        for name, value in sorted(summary["gauges"].items()):
+            metric = self._metric_name(name)
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+class Metrics:
+    """Fan-out point for instrumentation; with no sinks attached every call is a cheap no-op."""
+
+    def __init__(self, sinks: Optional[List[MetricsSink]] = None):
+        self.sinks: List[MetricsSink] = list(sinks or [])
+
+    def add_sink(self, sink: MetricsSink) -> MetricsSink:
+        self.sinks.append(sink)
+        return sink
+
+    def remove_sink(self, sink: MetricsSink) -> None:
+        self.sinks.remove(sink)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Times the enclosed block and reports it under name."""
+        if not self.sinks:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, value: float) -> None:
+        for sink in self.sinks:
+            sink.observe(name, value)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        for sink in self.sinks:
+            sink.incr(name, value)
+
+    def gauge(self, name: str, value: float) -> None:
+        for sink in self.sinks:
+            sink.gauge(name, value)
+
+# Process-wide default used by the recommender and the app
+METRICS = Metrics()
+
+def get_metrics() -> Metrics:
+    return METRICS
+
+def configure_from_env() -> Optional[MetricsSink]:
+    """Attaches a sink chosen by CAREER_METRICS_SINK (log, memory or prometheus) to the default Metrics once."""
+    kind = os.getenv("CAREER_METRICS_SINK", "").lower()
+    sinks = {"log": LoggingSink, "memory": InMemorySink, "prometheus": PrometheusTextSink}
+    if kind not in sinks:
+        return None
+    for sink in METRICS.sinks:
+        if type(sink) is sinks[kind]:
+            return sink
+    return METRICS.add_sink(sinks[kind]())
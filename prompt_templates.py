@@ -34,6 +34,14 @@ CLARIFYING_QUESTIONS = [
 # Prompt template for extracting interests from conversation using Mistral
 EXTRACT_INTERESTS_PROMPT = """You are an expert career guidance assistant. Your primary goal is to extract concise, actionable keywords and preferences from the entire conversation history that can directly map to career categories. Focus on terms related to fields (e.g., science, technology, business, arts, health, education), skills (e.g., programming, analysis, design, writing, teaching), and work activities (e.g., research, management, care, performance). Combine and refine all relevant terms across turns. Return them as a comma-separated list of single or short phrases (e.g., 'data analysis', 'creative writing', 'patient care')."""
 
+# Prompt template for incremental extraction: only the newest user turn and the running interest list are sent
+EXTRACT_INTERESTS_INCREMENTAL_PROMPT = """You are an expert career guidance assistant. You maintain a running list of a user's career-relevant interests. You will receive the interests known so far and the user's newest message. Update the list with concise, actionable keywords from the new message that can directly map to career categories, such as fields (e.g., science, technology, business, arts, health, education), skills (e.g., programming, analysis, design, writing, teaching), and work activities (e.g., research, management, care, performance). Keep earlier interests unless the user clearly contradicts them. Return the complete updated list as a comma-separated list of single or short phrases (e.g., 'data analysis', 'creative writing', 'patient care')."""
+
+# User message carrying the compact interest state plus the newest turn
+INCREMENTAL_EXTRACTION_MESSAGE = """Known interests: {known_interests}
+
+New message: {user_message}"""
+
 # Template for generating short explanations for recommended career paths
 CAREER_PATH_EXPLANATION_TEMPLATE = """Provide a concise and clear explanation for the career path: {career_path}. Highlight the key aspects, typical roles, and what makes this path unique and rewarding."""
 
@@ -49,5 +57,14 @@ def get_clarifying_question() -> str:
 def get_extract_interests_prompt() -> str:
     return EXTRACT_INTERESTS_PROMPT
 
+def get_extract_interests_incremental_prompt() -> str:
+    return EXTRACT_INTERESTS_INCREMENTAL_PROMPT
+
+def get_incremental_extraction_message(known_interests: List[str], user_message: str) -> str:
+    return INCREMENTAL_EXTRACTION_MESSAGE.format(
+        known_interests=", ".join(known_interests) if known_interests else "none yet",
+        user_message=user_message
+    )
+
 def get_career_path_explanation_prompt(career_path: str) -> str:
     return CAREER_PATH_EXPLANATION_TEMPLATE.format(career_path=career_path)
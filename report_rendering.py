@@ -0,0 +1,227 @@
+import csv
+import html
+import io
+import json
+from typing import Callable, Dict, List, NamedTuple, Optional, TextIO
+
+FORMATS = ("text", "markdown", "html", "json", "csv")
+EMPTY_MESSAGE = "I need more information to provide career recommendations. Could you tell me more about your interests?"
+CSV_COLUMNS = ["id", "interests", "rank", "path", "confidence", "description", "careers", "roadmap", "explanation", "error"]
+_MAX_CAREERS = 3 # Career options listed per path
+
+def confidence_class(confidence: float) -> str:
+    return "confidence-high" if confidence > 0.7 else "confidence-medium" if confidence > 0.4 else "confidence-low"
+
+class Templates(NamedTuple):
+    """str.format templates of one report format; fields are filled with format_map."""
+    prologue: str # Written once at the start of a document
+    epilogue: str # Written once at the end
+    record: str # Record heading with {id} and {interests}, only when a record id is given
+    error: str # {error}
+    header: str # Before the recommendations of one record
+    empty: str # Instead of the header and items when there are no recommendations
+    item: str # One recommendation
+    explanation: str # {explanation}, inserted into the item as {explanation_block}
+    list_item: str # One career option or roadmap step, with {rank} and {text}
+    list_separator: str
+    escape: Optional[Callable[[str], str]] # None when the format needs no escaping
+
+_TEXT_RULE = "=" * 30
+
+TEXT = Templates(
+    prologue="",
+    epilogue="",
+    record="Record: {id}\nInterests: {interests}\n\n",
+    error="Error: {error}\n\n",
+    header="Career Path Recommendations\n" + _TEXT_RULE + "\n\n",
+    empty=EMPTY_MESSAGE,
+    item=(
+        "Career Path: {path}\nMatch Confidence: {confidence_pct}\n" + "-" * 30 + "\n"
+        "Overview:\n{description}\n\n"
+        "{explanation_block}"
+        "Recommended Career Options:\n{careers}\n" + _TEXT_RULE + "\n\n"
+    ),
+    explanation="Why This Path:\n{explanation}\n\n",
+    list_item="{rank}. {text}\n",
+    list_separator="",
+    escape=None
+)
+
+MARKDOWN = Templates(
+    prologue="",
+    epilogue="",
+    record="# {id}\n\n**Interests:** {interests}\n\n",
+    error="**Error:** {error}\n\n",
+    header="## Career Path Recommendations\n\n",
+    empty=EMPTY_MESSAGE + "\n\n",
+    item=(
+        "### {path} ({confidence_pct})\n\n"
+        "**Overview:** {description}\n\n"
+        "{explanation_block}"
+        "**Recommended Career Options:**\n\n{careers}\n"
+        "**Career Roadmap:**\n\n{roadmap}\n"
+        "---\n\n"
+    ),
+    explanation="**Why This Path:** {explanation}\n\n",
+    list_item="{rank}. {text}\n",
+    list_separator="",
+    escape=None
+)
+
+HTML = Templates(
+    prologue=(
+        '<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n<title>Career Path Recommendations</title>\n'
+        "<style>.confidence-badge{padding:.2em .6em;border-radius:9999px;color:#fff;font-size:.8em}"
+        ".confidence-high{background:#059669}.confidence-medium{background:#d97706}.confidence-low{background:#dc2626}</style>\n"
+        "</head>\n<body>\n"
+    ),
+    epilogue="</body>\n</html>\n",
+    record="<h1>{id}</h1>\n<p><strong>Interests:</strong> {interests}</p>\n\n",
+    error='<p class="error"><strong>Error:</strong> {error}</p>\n\n',
+    header="",
+    empty=f"<p>{html.escape(EMPTY_MESSAGE)}</p>\n\n",
+    item=(
+        '<h2>{path} <span class="confidence-badge {confidence_class}">{confidence_pct}</span></h2>\n'
+        "<p><strong>Overview:</strong><br>{description}</p>\n"
+        "{explanation_block}"
+        "<p><strong>Recommended Career Options:</strong></p>\n"
+        "<ol>{careers}</ol>\n"
+        "<p><strong>Career Roadmap:</strong></p>\n"
+        "<ol>{roadmap}</ol>\n"
+        "<hr>\n\n"
+    ),
+    explanation="<p><strong>Why This Path:</strong><br>{explanation}</p>\n",
+    list_item="<li>{text}</li>",
+    list_separator=" ",
+    escape=lambda text: html.escape(text, quote=False)
+)
+
+TEMPLATES: Dict[str, Templates] = {"text": TEXT, "markdown": MARKDOWN, "html": HTML}
+
+class ReportWriter:
+    """
+    Streams recommendation reports to a text stream, one record at a time, so a
+    cohort export of any size runs in constant memory. Text, Markdown and HTML use
+    the templates above; JSON writes one object per line
+    and CSV one row per recommendation. begin() and end() frame a whole document
+    (the HTML page, the CSV header); single reports embedded elsewhere skip them.
+    """
+
+    def __init__(self, stream: TextIO, fmt: str = "text"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported report format: {fmt} (expected one of {', '.join(FORMATS)})")
+        self.stream = stream
+        self.fmt = fmt
+        self.templates = TEMPLATES.get(fmt)
+        self._csv = csv.writer(stream) if fmt == "csv" else None
+        self._json = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")) if fmt == "json" else None
+
+    def begin(self) -> None:
+        if self._csv is not None:
+            self._csv.writerow(CSV_COLUMNS)
+        elif self.templates is not None:
+            self.stream.write(self.templates.prologue)
+
+    def end(self) -> None:
+        if self.templates is not None:
+            self.stream.write(self.templates.epilogue)
+        self.stream.flush()
+
+    def write(self, recommendations: List[Dict], record_id: Optional[str] = None,
+              interests: Optional[List[str]] = None, error: Optional[str] = None) -> None:
+        """Writes one record: its recommendations and, for cohort exports, its id, interests and error."""
+        if self._json is not None:
+            self._write_json(recommendations, record_id, interests, error)
+        elif self._csv is not None:
+            self._write_csv(recommendations, record_id, interests, error)
+        else:
+            self._write_template(recommendations, record_id, interests, error)
+
+    def _write_template(self, recommendations: List[Dict], record_id: Optional[str],
+                        interests: Optional[List[str]], error: Optional[str]) -> None:
+        text = _render_template(self.templates, recommendations, record_id, interests, error)
+        if record_id is not None and not text.endswith("\n"):
+            text += "\n\n" # The bare text empty message would run into the next record
+        self.stream.write(text)
+
+    def _write_json(self, recommendations: List[Dict], record_id: Optional[str],
+                    interests: Optional[List[str]], error: Optional[str]) -> None:
+        record: Dict = {}
+        if record_id is not None:
+            record["id"] = record_id
+        if interests is not None:
+            record["interests"] = interests
+        record["recommendations"] = [
+            {**rec, "confidence": round(rec["confidence"], 4)} for rec in recommendations
+        ]
+        if error:
+            record["error"] = error
+        self.stream.write(self._json.encode(record) + "\n")
+
+    def _write_csv(self, recommendations: List[Dict], record_id: Optional[str],
+                   interests: Optional[List[str]], error: Optional[str]) -> None:
+        prefix = ["" if record_id is None else record_id, "; ".join(interests or [])]
+        if not recommendations:
+            self._csv.writerow(prefix + [""] * 7 + [error or ""])
+            return
+        for rank, rec in enumerate(recommendations, 1):
+            self._csv.writerow(prefix + [
+                rank, rec["path"], f"{rec['confidence']:.4f}", rec.get("description", ""),
+                "; ".join(rec.get("careers", [])[:_MAX_CAREERS]), "; ".join(rec.get("roadmap", [])),
+                rec.get("explanation") or "", error or ""
+            ])
+
+def _render_list(templates: Templates, items: List[str]) -> str:
+    list_item = templates.list_item
+    return templates.list_separator.join([list_item.format(rank=rank, text=text) for rank, text in enumerate(items, 1)])
+
+def _render_template(templates: Templates, recommendations: List[Dict], record_id: Optional[str] = None,
+                     interests: Optional[List[str]] = None, error: Optional[str] = None) -> str:
+    """One record through a text-like template set; parts are joined once instead of concatenated."""
+    escape = templates.escape or _identity
+    parts = []
+    if record_id is not None:
+        parts.append(templates.record.format(id=escape(str(record_id)), interests=escape(", ".join(interests or []))))
+    if error:
+        parts.append(templates.error.format(error=escape(error)))
+    if not recommendations:
+        parts.append(templates.empty)
+        return "".join(parts)
+    parts.append(templates.header)
+    with_roadmap = "{roadmap}" in templates.item # The text layout leaves the roadmap out
+    for rec in recommendations:
+        careers = rec["careers"][:_MAX_CAREERS]
+        roadmap = rec.get("roadmap", ()) if with_roadmap else ()
+        explanation = rec.get("explanation")
+        if templates.escape is not None:
+            careers, roadmap = [escape(text) for text in careers], [escape(text) for text in roadmap]
+        parts.append(templates.item.format_map({
+            "path": escape(rec["path"]),
+            "confidence_pct": f"{rec['confidence']:.0%}",
+            "confidence_class": confidence_class(rec["confidence"]),
+            "description": escape(rec["description"]),
+            "explanation_block": templates.explanation.format(explanation=escape(explanation)) if explanation else "",
+            "careers": _render_list(templates, careers),
+            "roadmap": _render_list(templates, roadmap)
+        }))
+    return "".join(parts)
+
+def _identity(text: str) -> str:
+    return text
+
+def render_report(recommendations: List[Dict], fmt: str = "text", document: bool = False) -> str:
+    """
+    Renders one set of recommendations as a string. With document=True it is a
+    standalone file (HTML page, CSV with header), as offered for download.
+    """
+    templates = TEMPLATES.get(fmt)
+    if templates is not None and not document:
+        return _render_template(templates, recommendations)
+    buffer = io.StringIO(newline="")
+    writer = ReportWriter(buffer, fmt)
+    if document:
+        writer.begin()
+    writer.write(recommendations)
+    if document:
+        writer.end()
+    return buffer.getvalue()
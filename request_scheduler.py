@@ -0,0 +1,208 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from metrics import Metrics, get_metrics
+
+class TokenBucket:
+    """Thread-safe token bucket: refills at `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Blocks until the tokens are available and returns the time spent waiting."""
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return now - started
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+class _Job:
+    __slots__ = ("fn", "key", "future", "enqueued_at")
+
+    def __init__(self, fn: Callable[[], Any], key: Optional[str]):
+        self.fn = fn
+        self.key = key
+        self.future: Future = Future()
+        self.enqueued_at = time.monotonic()
+
+class _StreamBroadcast:
+    """Chunks of one upstream stream, buffered so every coalesced reader gets them all from the start."""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._condition = threading.Condition()
+
+    def run(self, open_stream: Callable[[], Iterable]) -> None:
+        try:
+            for chunk in open_stream():
+                with self._condition:
+                    self.chunks.append(chunk)
+                    self._condition.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            with self._condition:
+                self.done = True
+                self._condition.notify_all()
+
+    def __iter__(self) -> Iterator:
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self.chunks) and not self.done:
+                    self._condition.wait()
+                available = self.chunks[index:]
+                finished = self.done and index + len(available) == len(self.chunks)
+            yield from available
+            index += len(available)
+            if finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+class ExtractionScheduler:
+    """
+    Shared scheduler for upstream LLM calls across sessions.
+
+    - A token bucket keeps the call rate within the provider quota.
+    - Identical in-flight requests (same key) are coalesced into one upstream call
+      whose result is handed to every waiting caller. Streams are coalesced too:
+      a caller joining late gets the chunks received so far, then the rest.
+    - Queued calls are served by priority (lower value first) and, within a
+      priority, fairly across sessions using start-time fair queueing, so one busy
+      session cannot starve the others.
+
+    Queue depth, wait time and coalescing counts are reported through metrics.
+    """
+
+    def __init__(self, rate_per_second: float = 5.0, burst: Optional[float] = None, workers: int = 4,
+                 metrics: Optional[Metrics] = None):
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.workers = workers
+        self.metrics = metrics or get_metrics()
+        self._queue: List[Tuple[int, float, int, _Job]] = [] # (priority, virtual start tag, sequence, job)
+        self._inflight: Dict[str, _Job] = {}
+        self._streams: Dict[str, _StreamBroadcast] = {} # In-flight streams by key
+        self._session_tags: Dict[str, float] = {} # Virtual finish tag of each session's last queued job
+        self._virtual_time = 0.0
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def submit(self, fn: Callable[[], Any], key: Optional[str] = None, session_id: str = "default", priority: int = 0) -> Any:
+        """Runs fn through the scheduler and returns its result (or raises its exception)."""
+        return self.submit_async(fn, key, session_id, priority).result()
+
+    def submit_async(self, fn: Callable[[], Any], key: Optional[str] = None, session_id: str = "default",
+                     priority: int = 0) -> Future:
+        """Queues fn and returns a Future; identical keys already in flight share one Future."""
+        with self._condition:
+            if key is not None and key in self._inflight:
+                self.metrics.incr("scheduler.coalesced")
+                return self._inflight[key].future
+
+            job = _Job(fn, key)
+            if key is not None:
+                self._inflight[key] = job
+            tag = max(self._virtual_time, self._session_tags.get(session_id, 0.0))
+            self._session_tags[session_id] = tag + 1
+            heapq.heappush(self._queue, (priority, tag, next(self._sequence), job))
+            self.metrics.gauge("scheduler.queue_depth", len(self._queue))
+            self._ensure_workers()
+            self._condition.notify()
+            return job.future
+
+    def stream(self, open_stream: Callable[[], Iterable], key: Optional[str] = None, session_id: str = "default",
+               priority: int = 0) -> Iterator:
+        """
+        Runs a streaming call through the same queue as submit() and yields its
+        chunks as they arrive. The stream is read on a scheduler worker, so it holds
+        a worker slot and a bucket token like any other call.
+        """
+        with self._condition:
+            broadcast = self._streams.get(key) if key is not None else None
+            if broadcast is not None:
+                self.metrics.incr("scheduler.coalesced")
+                return iter(broadcast)
+            broadcast = _StreamBroadcast()
+            if key is not None:
+                self._streams[key] = broadcast
+
+        def read() -> None:
+            try:
+                broadcast.run(open_stream)
+            finally:
+                if key is not None:
+                    with self._condition:
+                        if self._streams.get(key) is broadcast:
+                            del self._streams[key]
+
+        self.submit_async(read, session_id=session_id, priority=priority)
+        return iter(broadcast)
+
+    def _ensure_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"extraction-scheduler-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, tag, _, job = heapq.heappop(self._queue)
+                self._virtual_time = max(self._virtual_time, tag)
+                self.metrics.gauge("scheduler.queue_depth", len(self._queue))
+                if len(self._session_tags) > 10000 and not self._queue:
+                    self._session_tags.clear() # Forget idle sessions once the queue drains
+
+            self.bucket.acquire()
+            self.metrics.observe("scheduler.wait", time.monotonic() - job.enqueued_at)
+            self.metrics.incr("scheduler.upstream_calls")
+            try:
+                result = job.fn()
+            except BaseException as e:
+                self._finish(job)
+                job.future.set_exception(e)
+            else:
+                self._finish(job)
+                job.future.set_result(result)
+
+    def _finish(self, job: _Job) -> None:
+        if job.key is not None:
+            with self._condition:
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
@@ -0,0 +1,222 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, List, Optional
+
+from metrics import Metrics, get_metrics, percentiles
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the provider while the circuit breaker is open."""
+
+class DeadlineExceeded(Exception):
+    """Raised when no attempt finished within the per-call deadline."""
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. After `failure_threshold` consecutive failures
+    it opens and rejects calls for `reset_timeout` seconds, then lets a single
+    trial call through (half-open); its outcome closes or reopens the circuit.
+    A trial whose caller never reports back (cancelled, abandoned) is released
+    with release(), and otherwise expires after another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and self._trial_in_flight and now - self._trial_started_at >= self.reset_timeout:
+                self._trial_in_flight = False # Stale trial; its caller never reported back
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                self._trial_started_at = now
+                return True
+            return False
+
+    def release(self) -> None:
+        """Gives back a call allowed by allow() that ended without an outcome, e.g. when it was cancelled."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+class ResilientCaller:
+    """
+    Wraps provider calls with a per-call deadline, hedged duplicates and a circuit breaker.
+
+    Once `hedge_min_samples` successful latencies have been seen, an attempt still
+    running after the `hedge_percentile` latency triggers a duplicate request; the
+    first success wins. Attempts that lose the race or miss the deadline are left to
+    finish in the background (sync) or cancelled (async). A sync attempt that keeps
+    running still holds a pooled-client connection slot, so at most
+    `max_outstanding_hedges` sync hedges run at once across all calls; beyond that,
+    calls wait without hedging rather than eat into the capacity hedging protects.
+    """
+
+    def __init__(self, deadline: float = 15.0, hedge_percentile: int = 95, hedge_min_samples: int = 20,
+                 max_hedges: int = 1, breaker: Optional[CircuitBreaker] = None, max_workers: int = 32,
+                 max_outstanding_hedges: int = 4, metrics: Optional[Metrics] = None):
+        self.deadline = deadline
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.max_hedges = max_hedges
+        self.max_outstanding_hedges = max_outstanding_hedges
+        self._outstanding_hedges = 0 # Sync hedge attempts still running, won or lost
+        self._hedge_lock = threading.Lock()
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or get_metrics()
+        self._latencies: Deque[float] = deque(maxlen=500) # Recent successful attempt latencies
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="resilient-call")
+
+    def hedge_delay(self) -> Optional[float]:
+        """Latency after which a duplicate request is sent, or None while there is too little data."""
+        if self.max_hedges <= 0 or len(self._latencies) < self.hedge_min_samples:
+            return None
+        return percentiles(list(self._latencies), (self.hedge_percentile,))[f"p{self.hedge_percentile}"]
+
+    def _start_hedge(self, fn: Callable[[], Any]) -> Optional[Future]:
+        """Submits a sync hedge attempt, or returns None when the outstanding-hedge cap is reached."""
+        with self._hedge_lock:
+            if self._outstanding_hedges >= self.max_outstanding_hedges:
+                return None
+            self._outstanding_hedges += 1
+        future = self._executor.submit(self._timed, fn)
+        future.add_done_callback(self._hedge_finished)
+        return future
+
+    def _hedge_finished(self, future: Future) -> None:
+        with self._hedge_lock:
+            self._outstanding_hedges -= 1
+
+    def _timed(self, fn: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        result = fn()
+        self._latencies.append(time.perf_counter() - started)
+        return result
+
+    def call(self, fn: Callable[[], Any]) -> Any:
+        """Runs fn with deadline, hedging and breaker protection."""
+        if not self.breaker.allow():
+            self.metrics.incr("resilience.rejected")
+            raise CircuitOpenError("Provider circuit is open")
+
+        deadline_at = time.monotonic() + self.deadline
+        hedge_delay = self.hedge_delay()
+        pending: List[Future] = [self._executor.submit(self._timed, fn)]
+        hedges = 0
+        last_error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                timeout = remaining
+                if hedge_delay is not None and hedges < self.max_hedges:
+                    timeout = min(remaining, hedge_delay)
+                done, not_done = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                pending = list(not_done)
+                for future in done:
+                    if future.exception() is None:
+                        self.breaker.record_success()
+                        return future.result()
+                    last_error = future.exception()
+                if not done and hedge_delay is not None and hedges < self.max_hedges:
+                    hedges += 1
+                    hedge = self._start_hedge(fn)
+                    if hedge is None:
+                        self.metrics.incr("resilience.hedges_skipped")
+                    else:
+                        self.metrics.incr("resilience.hedges")
+                        pending.append(hedge)
+        except BaseException:
+            self.breaker.release() # Interrupted before an outcome; don't strand a half-open trial
+            raise
+
+        self.breaker.record_failure()
+        if last_error is not None and not pending:
+            self.metrics.incr("resilience.failures")
+            raise last_error
+        self.metrics.incr("resilience.deadline_exceeded")
+        raise DeadlineExceeded(f"No response within {self.deadline:.1f}s")
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Async counterpart of call(); losing and overdue attempts are cancelled."""
+        import asyncio # Only async callers pay for importing asyncio
+        if not self.breaker.allow():
+            self.metrics.incr("resilience.rejected")
+            raise CircuitOpenError("Provider circuit is open")
+
+        async def timed() -> Any:
+            started = time.perf_counter()
+            result = await fn()
+            self._latencies.append(time.perf_counter() - started)
+            return result
+
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline
+        hedge_delay = self.hedge_delay()
+        pending = {asyncio.ensure_future(timed())}
+        hedges = 0
+        last_error: Optional[BaseException] = None
+        try:
+            while pending:
+                remaining = deadline_at - loop.time()
+                if remaining <= 0:
+                    break
+                timeout = remaining
+                if hedge_delay is not None and hedges < self.max_hedges:
+                    timeout = min(remaining, hedge_delay)
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.breaker.record_success()
+                        return task.result()
+                    last_error = task.exception()
+                if not done and hedge_delay is not None and hedges < self.max_hedges:
+                    hedges += 1
+                    self.metrics.incr("resilience.hedges")
+                    pending.add(asyncio.ensure_future(timed()))
+        except BaseException:
+            self.breaker.release() # Cancelled before an outcome; don't strand a half-open trial
+            raise
+        finally:
+            for task in pending:
+                task.cancel()
+
+        self.breaker.record_failure()
+        if last_error is not None and not pending:
+            self.metrics.incr("resilience.failures")
+            raise last_error
+        self.metrics.incr("resilience.deadline_exceeded")
+        raise DeadlineExceeded(f"No response within {self.deadline:.1f}s")
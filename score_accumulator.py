@@ -0,0 +1,122 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from career_catalog import CareerCatalog
+from career_paths import get_catalog
+from keyword_matcher import tokenize
+
+class ScoreAccumulator:
+    """
+    Per-session running keyword hits per career path.
+
+    Each distinct interest is scored once, when it first appears, so a turn costs
+    O(new interests) regardless of how long the conversation is. With `decay` < 1
+    every finished turn shrinks older hits by that factor, favouring recent
+    interests. Decay is applied lazily: new hits are stored divided by a running
+    scale factor instead of rescaling every path each turn. Because uniform decay
+    never changes the ordering, top-k reads come from a lazily pruned heap.
+    """
+
+    def __init__(self, catalog: Optional[CareerCatalog] = None, decay: float = 1.0):
+        if not 0.0 < decay <= 1.0:
+            raise ValueError("decay must be in (0, 1]")
+        self.catalog = catalog or get_catalog()
+        self._positions = {path: i for i, path in enumerate(self.catalog.paths)} # Ties rank in catalog order
+        self.decay = decay
+        self.turns = 0
+        self._scale = 1.0 # decay ** turns, reset to 1 by _rebase before it underflows
+        self._raw: Dict[str, float] = {} # Path -> accumulated hits / scale at the time they were added
+        self._total = 0.0 # Sum of _raw values
+        self._seen: Dict[str, float] = {} # Normalized interest -> raw weight it was added with
+        self._heap: List[Tuple[float, int, str]] = [] # (-raw, position, path); entries go stale when raw grows
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def _key(self, interest: str) -> str:
+        return " ".join(tokenize(interest, self.catalog.matcher.normalize))
+
+    def add(self, interests: Iterable[str]) -> int:
+        """Scores interests not seen before in this session; returns how many were new."""
+        added = 0
+        weight = 1.0 / self._scale
+        for interest in interests:
+            key = self._key(interest)
+            if not key or key in self._seen:
+                continue
+            self._seen[key] = weight
+            self._apply(key, weight)
+            added += 1
+        return added
+
+    def _apply(self, key: str, weight: float) -> None:
+        matcher = self.catalog.matcher
+        for keyword_id in matcher.match_ids(key):
+            for path in matcher.keyword_paths[keyword_id]:
+                raw = self._raw.get(path, 0.0) + weight
+                self._raw[path] = raw
+                self._total += weight
+                heapq.heappush(self._heap, (-raw, self._positions[path], path))
+        if len(self._heap) > 4 * len(self._raw) + 64:
+            self._rebuild_heap() # Drop stale entries
+
+    def advance_turn(self) -> None:
+        """Ends a turn: hits recorded so far are worth `decay` times as much from now on."""
+        self.turns += 1
+        if self.decay < 1.0:
+            self._scale *= self.decay
+            if self._scale < 1e-100:
+                self._rebase()
+
+    def _rebase(self) -> None:
+        # Fold the scale into the stored values; the only O(paths) step, and a rare one
+        self._raw = {path: raw * self._scale for path, raw in self._raw.items()}
+        self._seen = {key: weight * self._scale for key, weight in self._seen.items()}
+        self._total *= self._scale
+        self._scale = 1.0
+        self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(-raw, self._positions[path], path) for path, raw in self._raw.items()]
+        heapq.heapify(self._heap)
+
+    def scores(self) -> Dict[str, float]:
+        """Current decayed hit counts per path."""
+        return {path: raw * self._scale for path, raw in self._raw.items()}
+
+    def top(self, k: int = 3) -> List[Tuple[str, float]]:
+        """Top k (path, confidence) pairs, confidence being each path's share of all decayed hits."""
+        if self._total <= 0:
+            return []
+        found: List[Tuple[float, int, str]] = []
+        seen_paths = set()
+        while self._heap and len(found) < k:
+            entry = heapq.heappop(self._heap)
+            path = entry[2]
+            if path in seen_paths or self._raw.get(path) != -entry[0]:
+                continue # Stale entry superseded by a later push
+            seen_paths.add(path)
+            found.append(entry)
+        for entry in found:
+            heapq.heappush(self._heap, entry)
+        return [(path, -negative_raw / self._total) for negative_raw, _, path in found]
+
+    def to_state(self) -> Dict:
+        """Seen interests with their current weights; scores are recomputed from them on load."""
+        return {"turns": self.turns, "seen": {key: weight * self._scale for key, weight in self._seen.items()}}
+
+    def load_state(self, state: Dict) -> None:
+        self.turns = state["turns"]
+        self._scale = 1.0
+        self._seen = dict(state["seen"])
+        self.rebuild(self.catalog)
+
+    def rebuild(self, catalog: CareerCatalog) -> None:
+        """Rescores every seen interest against a new catalog, keeping their recency weights."""
+        self.catalog = catalog
+        self._positions = {path: i for i, path in enumerate(catalog.paths)}
+        seen = self._seen
+        self._raw, self._total, self._heap, self._seen = {}, 0.0, [], {}
+        for key, weight in seen.items():
+            self._seen[key] = weight
+            self._apply(key, weight)
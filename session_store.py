@@ -0,0 +1,202 @@
+import dbm
+import json
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+def encode_state(state: Dict) -> bytes:
+    """Compact JSON, zlib-compressed; conversation text compresses several-fold."""
+    return zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"))
+
+def decode_state(data: bytes) -> Dict:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+class SessionStore:
+    """
+    Pluggable home for serialized session state (see CareerRecommender.to_state).
+
+    Any process sharing a store can resume any session, so requests no longer need
+    to be pinned to the worker that started the conversation. Sessions untouched
+    for `ttl_seconds` are treated as gone. Concurrent turns of one session on two
+    workers are not merged: the last save wins.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds
+
+    def load(self, session_id: str) -> Optional[Dict]:
+        """Returns the stored state, or None if the session is unknown or expired."""
+        data = self._get(session_id)
+        if data is None:
+            return None
+        saved_at, payload = data
+        if self.ttl_seconds is not None and saved_at + self.ttl_seconds < time.time():
+            self._delete(session_id)
+            return None
+        return decode_state(payload)
+
+    def save(self, session_id: str, state: Dict) -> None:
+        self._put(session_id, time.time(), encode_state(state))
+
+    def delete(self, session_id: str) -> bool:
+        """Removes a session; returns False if it was not stored."""
+        return self._delete(session_id)
+
+    def prune(self) -> int:
+        """Deletes expired sessions where the backend can do so in bulk; returns how many were removed."""
+        return 0
+
+    def close(self) -> None:
+        pass
+
+    def _get(self, session_id: str) -> Optional[Tuple[float, bytes]]:
+        raise NotImplementedError
+
+    def _put(self, session_id: str, saved_at: float, payload: bytes) -> None:
+        raise NotImplementedError
+
+    def _delete(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+class MemorySessionStore(SessionStore):
+    """In-process LRU of encoded states; survives Streamlit reruns but not restarts, and is not shared."""
+
+    def __init__(self, max_sessions: int = 10000, ttl_seconds: Optional[float] = None):
+        super().__init__(ttl_seconds)
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _get(self, session_id: str) -> Optional[Tuple[float, bytes]]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                self._sessions.move_to_end(session_id)
+            return entry
+
+    def _put(self, session_id: str, saved_at: float, payload: bytes) -> None:
+        with self._lock:
+            self._sessions[session_id] = (saved_at, payload)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False) # Evict least recently used
+
+    def _delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file in WAL mode, shared by every worker process on the
+    host (or on a shared volume). Each save is a single-row upsert.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        super().__init__(ttl_seconds)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10.0)
+        self._db.execute("PRAGMA journal_mode=WAL") # Readers in other processes do not block writers
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, state BLOB NOT NULL, saved_at REAL NOT NULL)"
+        )
+        self._db.commit()
+        self._lock = threading.Lock()
+
+    def _get(self, session_id: str) -> Optional[Tuple[float, bytes]]:
+        with self._lock:
+            row = self._db.execute("SELECT saved_at, state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return (row[0], row[1]) if row is not None else None
+
+    def _put(self, session_id: str, saved_at: float, payload: bytes) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, state, saved_at) VALUES (?, ?, ?)",
+                (session_id, payload, saved_at)
+            )
+            self._db.commit()
+
+    def _delete(self, session_id: str) -> bool:
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount > 0
+            self._db.commit()
+        return deleted
+
+    def prune(self) -> int:
+        """Deletes expired sessions and returns how many were removed."""
+        if self.ttl_seconds is None:
+            return 0
+        with self._lock:
+            pruned = self._db.execute("DELETE FROM sessions WHERE saved_at < ?", (time.time() - self.ttl_seconds,)).rowcount
+            self._db.commit()
+        return pruned
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+class KeyValueSessionStore(SessionStore):
+    """
+    Sessions in a local dbm key-value file, standing in for a networked key-value
+    store: values are opaque bytes (an 8-byte save time followed by the encoded
+    state), so swapping in another byte store only means replacing `self._db`.
+    dbm files are not safe for concurrent writers, so use one per process or the
+    SQLite store when several workers share a host.
+    """
+
+    _HEADER = struct.Struct("!d")
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        super().__init__(ttl_seconds)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._db = dbm.open(path, "c")
+        self._lock = threading.Lock()
+
+    def _get(self, session_id: str) -> Optional[Tuple[float, bytes]]:
+        with self._lock:
+            value = self._db.get(session_id.encode("utf-8"))
+        if value is None:
+            return None
+        return self._HEADER.unpack_from(value)[0], value[self._HEADER.size:]
+
+    def _put(self, session_id: str, saved_at: float, payload: bytes) -> None:
+        with self._lock:
+            self._db[session_id.encode("utf-8")] = self._HEADER.pack(saved_at) + payload
+
+    def _delete(self, session_id: str) -> bool:
+        with self._lock:
+            try:
+                del self._db[session_id.encode("utf-8")]
+            except KeyError:
+                return False
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+def open_session_store(spec: Optional[str], ttl_seconds: Optional[float] = None) -> Optional[SessionStore]:
+    """Builds a store from "memory", "sqlite:PATH" or "dbm:PATH"; None or "" means no store."""
+    if not spec:
+        return None
+    kind, _, path = spec.partition(":")
+    if kind == "memory":
+        return MemorySessionStore(ttl_seconds=ttl_seconds)
+    if kind == "sqlite" and path:
+        return SQLiteSessionStore(path, ttl_seconds)
+    if kind == "dbm" and path:
+        return KeyValueSessionStore(path, ttl_seconds)
+    raise ValueError(f"Unsupported session store: {spec!r} (expected memory, sqlite:PATH or dbm:PATH)")
@@ -0,0 +1,29 @@
+import asyncio
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from api_server import RecommenderAPI
+from metrics import PrometheusTextSink
+
+def get(api, path):
+    async def fetch():
+        async with TestClient(TestServer(api.create_app())) as client:
+            response = await client.get(path)
+            return response.status, response.headers.get("Content-Type"), await response.text()
+    return asyncio.run(fetch())
+
+def test_metrics_endpoint_serves_prometheus_text():
+    api = RecommenderAPI()
+    sink = api.metrics.add_sink(PrometheusTextSink())
+    try:
+        api.metrics.incr("api.sessions_resumed")
+        status, content_type, body = get(api, "/metrics")
+    finally:
+        api.metrics.remove_sink(sink)
+    assert status == 200
+    assert content_type.startswith("text/plain; version=0.0.4")
+    assert "career_recommender_api_sessions_resumed_total 1" in body
+
+def test_metrics_endpoint_is_absent_without_prometheus_sink():
+    status, _, _ = get(RecommenderAPI(), "/metrics")
+    assert status == 404
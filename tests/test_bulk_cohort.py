@@ -0,0 +1,134 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import bulk_cohort
+from bulk_cohort import CohortExtractor, ExtractionOutage, load_checkpoint, run_cohort
+
+WORDS = ["coding", "math", "painting", "music", "nursing", "teaching", "football", "finance"]
+
+class Crash(BaseException):
+    """Stands in for the process being killed; not caught as a failed record."""
+
+class FakeClient:
+    """Replies with the interests named in the response, like a well-behaved extraction call."""
+
+    def __init__(self, fail_on=(), crash_after=None, outage_after=None):
+        self.fail_on = set(fail_on)
+        self.crash_after = crash_after
+        self.outage_after = outage_after
+        self.calls = 0
+
+    def chat(self, model, messages, temperature=None):
+        self.calls += 1
+        if self.crash_after is not None and self.calls > self.crash_after:
+            raise Crash()
+        text = messages[-1].content
+        outage = self.outage_after is not None and self.calls > self.outage_after
+        if outage or any(word in text for word in self.fail_on):
+            raise ConnectionError("provider unavailable")
+        reply = ", ".join(word for word in WORDS if word in text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))])
+
+@pytest.fixture
+def cohort(tmp_path):
+    path = tmp_path / "cohort.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(200):
+            f.write(json.dumps({"id": f"s{i}", "response": f"I like {WORDS[i % 8]} and {WORDS[(i * 3) % 8]}"}) + "\n")
+    return str(path)
+
+def run(cohort, output, client, **options):
+    extractor = CohortExtractor(client=client, retries=0)
+    return run_cohort(cohort, output, extractor, workers=1, batch_size=16, progress=False, **options)
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+@pytest.mark.parametrize("extension", ["jsonl", "csv", "html"])
+def test_resume_after_crash_matches_clean_run(cohort, tmp_path, extension):
+    clean = str(tmp_path / f"clean.{extension}")
+    run(cohort, clean, FakeClient())
+
+    output = str(tmp_path / f"resumed.{extension}")
+    with pytest.raises(Crash):
+        run(cohort, output, FakeClient(crash_after=70))
+    assert load_checkpoint(output + ".checkpoint")["records"] == 64 # Four full batches
+
+    client = FakeClient()
+    result = run(cohort, output, client)
+    assert result["resumed_at"] == 64
+    assert client.calls == 200 - 64
+    assert read(output) == read(clean)
+
+def test_resume_truncates_rows_written_after_the_checkpoint(cohort, tmp_path, monkeypatch):
+    clean = str(tmp_path / "clean.jsonl")
+    run(cohort, clean, FakeClient())
+
+    output = str(tmp_path / "resumed.jsonl")
+    save_checkpoint = bulk_cohort.save_checkpoint
+    saves = []
+
+    def crash_on_third_save(path, checkpoint):
+        saves.append(checkpoint)
+        if len(saves) == 3:
+            raise Crash() # The third batch is written but never checkpointed
+        save_checkpoint(path, checkpoint)
+
+    monkeypatch.setattr(bulk_cohort, "save_checkpoint", crash_on_third_save)
+    with pytest.raises(Crash):
+        run(cohort, output, FakeClient())
+    monkeypatch.setattr(bulk_cohort, "save_checkpoint", save_checkpoint)
+    assert len(read(output).splitlines()) == 48
+
+    run(cohort, output, FakeClient())
+    assert read(output) == read(clean)
+
+def test_outage_stops_before_failed_records_and_resume_retries_them(cohort, tmp_path):
+    clean = str(tmp_path / "clean.jsonl")
+    run(cohort, clean, FakeClient())
+
+    output = str(tmp_path / "resumed.jsonl")
+    with pytest.raises(ExtractionOutage):
+        run(cohort, output, FakeClient(outage_after=40), max_consecutive_failures=3)
+    # Two full batches plus the eight records before the streak; the failed records are not written
+    assert load_checkpoint(output + ".checkpoint")["records"] == 40
+    assert len(read(output).splitlines()) == 40
+
+    run(cohort, output, FakeClient())
+    assert read(output) == read(clean)
+
+def test_isolated_failures_are_written_with_their_error(cohort, tmp_path):
+    output = str(tmp_path / "out.jsonl")
+    result = run(cohort, output, FakeClient(fail_on=["I like nursing"]))
+    records = [json.loads(line) for line in read(output).splitlines()]
+    failed = [record for record in records if "error" in record]
+    assert result["errors"] == len(failed) == 25
+    assert all(record["recommendations"] == [] for record in failed)
+
+def test_missing_output_with_checkpoint_starts_over(cohort, tmp_path):
+    output = tmp_path / "out.jsonl"
+    with pytest.raises(Crash):
+        run(cohort, str(output), FakeClient(crash_after=40))
+    output.unlink()
+
+    result = run(cohort, str(output), FakeClient())
+    assert result["resumed_at"] == 0
+    assert len(read(output).splitlines()) == 200
+
+def test_extractor_retries_with_backoff(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(bulk_cohort.time, "sleep", sleeps.append)
+
+    class Flaky(FakeClient):
+        def chat(self, model, messages, temperature=None):
+            if self.calls < 2:
+                self.calls += 1
+                raise ConnectionError("try again")
+            return super().chat(model, messages, temperature)
+
+    extractor = CohortExtractor(client=Flaky(), retries=3, retry_backoff=0.5)
+    assert extractor.extract("I like music") == ["music"]
+    assert sleeps == [0.5, 1.0]
@@ -0,0 +1,34 @@
+import pytest
+from mistralai.exceptions import MistralConnectionException
+from mistralai.models.chat_completion import ChatMessage
+
+from benchmarks.stub_server import StubMistralServer
+from client_pool import PooledMistralClient
+
+MESSAGES = [ChatMessage(role="user", content="hello")]
+STREAM = {"model": "m", "messages": [{"role": "user", "content": "hello"}], "stream": True}
+
+@pytest.fixture
+def server():
+    with StubMistralServer(response_text="word " * 2000, stream_chunk_size=5) as stub:
+        yield stub
+
+def make_client(server):
+    return PooledMistralClient(api_key="stub", endpoint=server.url, max_retries=0, pool_size=2, pool_timeout=2)
+
+def test_abandoned_streams_return_their_connections(server):
+    client = make_client(server)
+    for _ in range(3):
+        for _chunk in client.chat_stream("m", MESSAGES):
+            break # Closing the generator closes the response
+    assert sum(1 for _chunk in client.chat_stream("m", MESSAGES)) == 2000
+    assert client.chat("m", MESSAGES).choices[0].message.content.startswith("word")
+
+def test_exhausted_pool_raises_instead_of_hanging(server):
+    client = make_client(server)
+    leaked = [client._request("post", STREAM, "v1/chat/completions", stream=True) for _ in range(2)]
+    with pytest.raises(MistralConnectionException):
+        client.chat("m", MESSAGES)
+    for response in leaked:
+        response.close()
+    assert client.chat("m", MESSAGES).choices[0].message.content.startswith("word")
@@ -0,0 +1,51 @@
+import copy
+
+import pytest
+
+from career_catalog import CareerCatalog
+from career_paths import CAREER_PATHS, CATALOG_STORE, map_interests_to_careers
+from interest_extractors import KeywordInterestExtractor
+from keyword_matcher import KeywordMatcher, fold_plural
+
+def top_path(interest):
+    path, score = map_interests_to_careers([interest])[0]
+    return path if score > 0 else None
+
+@pytest.mark.parametrize("interest, path", [
+    ("healthcare", "Healthcare"),
+    ("mathematics", "STEM"),
+    ("designer", "Arts"),
+    ("musician", "Arts"),
+    ("artists", "Arts"),
+    ("technologies", "STEM"),
+    ("machine learning", "STEM"),
+    ("e-learning", "Education"),
+])
+def test_derived_and_inflected_words_match(interest, path):
+    assert top_path(interest) == path
+
+@pytest.mark.parametrize("interest", ["start", "career", "careers", "artificial", "party"])
+def test_keywords_inside_unrelated_words_do_not_match(interest):
+    assert top_path(interest) is None
+
+def test_compound_word_counts_both_keywords():
+    matcher = KeywordMatcher.from_career_paths(CAREER_PATHS)
+    assert matcher.match("healthcare") == ["health", "care"]
+    assert matcher.path_hits(["healthcare"]) == {"Healthcare": 2}
+
+def test_fold_plural():
+    assert [fold_plural(t) for t in ["arts", "technologies", "business", "bus", "therapies"]] == [
+        "art", "technology", "business", "bus", "therapy"
+    ]
+
+def test_extractor_follows_catalog_reloads():
+    extractor = KeywordInterestExtractor()
+    history = [{"role": "user", "content": "I enjoy pottery"}]
+    assert extractor.extract(history) == []
+    paths = copy.deepcopy(CAREER_PATHS)
+    paths["Arts"]["keywords"].append("pottery")
+    previous = CATALOG_STORE.swap(CareerCatalog.from_mapping(paths))
+    try:
+        assert extractor.extract(history) == ["pottery"]
+    finally:
+        CATALOG_STORE.swap(previous)
@@ -0,0 +1,19 @@
+from metrics import percentiles
+
+def test_percentiles_nearest_rank_of_one_hundred():
+    samples = list(range(1, 101))
+    assert percentiles(samples, (1, 50, 90, 95, 99, 100)) == {
+        "p1": 1, "p50": 50, "p90": 90, "p95": 95, "p99": 99, "p100": 100
+    }
+
+def test_percentiles_nearest_rank_of_ten():
+    samples = [10, 3, 7, 1, 9, 2, 8, 4, 6, 5] # Order does not matter
+    assert percentiles(samples, (5, 10, 50, 90, 95)) == {"p5": 1, "p10": 1, "p50": 5, "p90": 9, "p95": 10}
+
+def test_percentiles_small_and_empty_samples():
+    assert percentiles([4.2]) == {"p50": 4.2, "p90": 4.2, "p95": 4.2, "p99": 4.2}
+    assert percentiles([]) == {"p50": 0.0, "p90": 0.0, "p95": 0.0, "p99": 0.0}
+
+def test_percentiles_float_points():
+    assert percentiles(list(range(1, 1001)), (99.9,)) == {"p99.9": 999}
+    assert percentiles(list(range(1, 101)), (7,)) == {"p7": 7}
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from metrics import InMemorySink, Metrics
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, ResilientCaller
+
+def open_breaker(reset_timeout=0.05):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success() # A success resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+def test_half_open_allows_a_single_trial():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+def test_failed_trial_reopens():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+def test_released_trial_lets_the_next_call_try():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.allow()
+
+def test_stale_trial_expires_after_reset_timeout():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow() # Its caller never reports back
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+def test_cancelled_async_trial_does_not_wedge_the_breaker():
+    caller = ResilientCaller(deadline=5, breaker=open_breaker(), metrics=Metrics())
+    time.sleep(0.06)
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        trial = asyncio.ensure_future(caller.acall(slow))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+        async def ok():
+            return "ok"
+
+        return await caller.acall(ok)
+
+    assert asyncio.run(scenario()) == "ok"
+    assert caller.breaker.state == CircuitBreaker.CLOSED
+
+def test_open_breaker_rejects_calls():
+    sink = InMemorySink()
+    caller = ResilientCaller(breaker=open_breaker(reset_timeout=60), metrics=Metrics([sink]))
+    with pytest.raises(CircuitOpenError):
+        caller.call(lambda: "never")
+    assert sink.counters["resilience.rejected"] == 1
+
+def test_sync_hedges_are_capped_and_counted():
+    sink = InMemorySink()
+    caller = ResilientCaller(deadline=0.1, hedge_min_samples=1, max_outstanding_hedges=2,
+                             breaker=CircuitBreaker(failure_threshold=100), metrics=Metrics([sink]))
+    caller._latencies.append(0.01) # Hedge after 10 ms
+    release = threading.Event()
+
+    def stuck():
+        release.wait(5)
+        return "late"
+
+    for _ in range(3):
+        with pytest.raises(DeadlineExceeded):
+            caller.call(stuck)
+    assert sink.counters["resilience.hedges"] == 2
+    assert sink.counters["resilience.hedges_skipped"] == 1
+    assert caller._outstanding_hedges == 2
+
+    release.set()
+    caller._executor.shutdown(wait=True)
+    assert caller._outstanding_hedges == 0